@@ -5,17 +5,25 @@ Book OCR to TTS Pipeline Package
 A modular pipeline for processing images through OCR and converting to speech.
 """
 
+import importlib
+
 from .config import PipelineConfig, OCRConfig, TTSConfig, ProcessingConfig, TranslationConfig
-from .pipeline import BookOCRTTSPipeline
-from .ocr_service import OCRService
-from .tts_service import TTSService
-from .text_processor import TextProcessor
-from .translation_service import TranslationService
 from .progress_tracker import ProgressTracker, ProcessingStats
 from .file_manager import FileManager
 from .retry_handler import RetryHandler
 from .cli import CLIInterface
 
+# Service modules pull in openai / edge-tts / pydub, so they are only imported
+# on first attribute access (PEP 562). This keeps `--help` and the progress
+# management commands fast.
+_LAZY_IMPORTS = {
+    "BookOCRTTSPipeline": ".pipeline",
+    "OCRService": ".ocr_service",
+    "TTSService": ".tts_service",
+    "TextProcessor": ".text_processor",
+    "TranslationService": ".translation_service",
+}
+
 __version__ = "2.0.0"
 __author__ = "Pipeline Development Team"
 
@@ -36,3 +44,18 @@ __all__ = [
     "RetryHandler",
     "CLIInterface"
 ]
+
+
+def __getattr__(name: str):
+    """Import service classes lazily on first access."""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # Cache so later lookups bypass __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
@@ -13,9 +13,7 @@ The new architecture provides:
 For backward compatibility, this file will redirect to the new implementation.
 """
 
-import os
 import sys
-import subprocess
 
 if __name__ == "__main__":
     # Show deprecation notice
@@ -23,11 +21,6 @@ if __name__ == "__main__":
     print("🔄 Redirecting to the new modular implementation...")
     print("📝 Please consider using 'book_ocr_tts_refactored.py' directly in the future.\n")
     
-    # Get the directory containing this script
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    main_py_path = os.path.join(script_dir, "main.py")
-    
-    # Execute main.py with the same arguments
-    cmd = [sys.executable, main_py_path] + sys.argv[1:]
-    exit_code = subprocess.run(cmd).returncode
-    sys.exit(exit_code)
\ No newline at end of file
+    # Run main.py in-process instead of spawning a second interpreter
+    from main import main
+    sys.exit(main(sys.argv[1:]))
@@ -4,11 +4,50 @@ Command-line interface for the Book OCR to TTS Pipeline.
 """
 
 import argparse
+import atexit
+import logging
+import logging.handlers
 import os
+import queue
 import sys
 from typing import Optional
 
-from config import PipelineConfig
+from config import LOCAL_OCR_BACKENDS, PipelineConfig
+from file_manager import FileManager
+
+
+# Flags for commands that only touch the progress file
+ADMIN_FLAGS = ('--show_progress', '--cleanup_progress')
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging(level: str = "INFO") -> None:
+    """
+    Route log records through a queue drained by a single background thread.
+    
+    Concurrent tasks only enqueue records, so they never contend for stdout.
+    
+    Args:
+        level: Name of the minimum level to output
+    """
+    global _log_listener
+    
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _log_listener is not None:
+        return
+    
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    
+    _log_listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
 
 
 class CLIArgumentParser:
@@ -36,24 +75,56 @@ class CLIArgumentParser:
                            help="Start processing from specific step: ocr, cleaning, translation, or tts (default: ocr)")
         parser.add_argument("--no_resume", action="store_true",
                            help="Start fresh without resuming from previous progress")
+        parser.add_argument("--streaming", action="store_true",
+                           help="Start cleaning, translating and speaking the first pages while later "
+                                "pages are still being OCRed (only with --start_from ocr)")
         
         # OCR configuration
         parser.add_argument("--token_path", default="access_token/github_pat",
                            help="Path to GitHub token file")
         parser.add_argument("--model_name", default="openai/o4-mini",
-                           help="OCR model name. Options: openai/o4-mini, openai/gpt-4o, openai/gpt-4o-mini, etc. (default: openai/o4-mini)")
+                           help="OCR model name. Options: openai/o4-mini, openai/gpt-4o, openai/gpt-4o-mini, etc., or tesseract[:lang] for local OCR (default: openai/o4-mini)")
+        parser.add_argument("--llm_model",
+                           help="Model for text cleaning and, unless --translation_model is given, "
+                                "translation (default: same as --model_name; required for those "
+                                "steps with local OCR)")
         parser.add_argument("--endpoint", default="https://models.github.ai/inference",
                            help="API endpoint URL (default: https://models.github.ai/inference)")
+        parser.add_argument("--validate_connection", action="store_true",
+                           help="Check that the API endpoint is reachable before the first OCR request")
         parser.add_argument("--delay", type=float, default=1.0,
                            help="Delay between API calls in seconds (default: 1.0)")
+        parser.add_argument("--requests_per_second", type=float,
+                           help="Average OCR request rate; overrides --delay (default: 1 / delay)")
         parser.add_argument("--max_retries", type=int, default=3,
                            help="Maximum number of retries for API calls (default: 3)")
+        parser.add_argument("--max_concurrency", "--ocr_concurrency", dest="max_concurrency",
+                           type=int, default=4,
+                           help="Maximum number of concurrent OCR requests, or worker processes "
+                                "for local OCR backends (default: 4)")
+        parser.add_argument("--image_transport", choices=["base64", "url"], default="base64",
+                           help="How images are sent to the OCR model: inline base64, or as URLs "
+                                "built from --image_url_template (default: base64)")
+        parser.add_argument("--image_url_template", metavar="TEMPLATE",
+                           help="URL of each image for --image_transport url, with {name} standing "
+                                "for the image file name (e.g. https://host/pages/{name})")
+        parser.add_argument("--max_image_dim", type=int, metavar="PIXELS",
+                           help="Downscale images whose longest edge exceeds PIXELS (e.g. 1600) and "
+                                "send them as JPEG; requires Pillow (default: send images as they are)")
+        parser.add_argument("--cache_dir", default=".ocr_cache",
+                           help="Directory for cached OCR, cleaning and translation results (default: .ocr_cache)")
+        parser.add_argument("--no_cache", action="store_true",
+                           help="Don't read or write cached OCR, cleaning or translation results")
+        parser.add_argument("--clear_cache", action="store_true",
+                           help="Delete cached OCR results before processing")
         
         # TTS configuration
         parser.add_argument("--voice", default="en-US-JennyNeural", 
                            help="TTS voice (default: en-US-JennyNeural)")
         parser.add_argument("--audio_bitrate", default="48k",
                            help="Audio bitrate for compressed output (default: 48k)")
+        parser.add_argument("--tts_concurrency", type=int, default=8, metavar="N",
+                           help="Number of text chunks synthesized at the same time (default: 8)")
         
         # Translation configuration
         parser.add_argument("--source_language", default="auto",
@@ -62,6 +133,13 @@ class CLIArgumentParser:
                            help="Target language for translation (default: English)")
         parser.add_argument("--skip_translation", action="store_true",
                            help="Skip translation step (default: skip)")
+        parser.add_argument("--translation_endpoint",
+                           help="API endpoint for translation (default: same as --endpoint)")
+        parser.add_argument("--translation_model",
+                           help="Model for translation (default: same as --llm_model, or --model_name)")
+        parser.add_argument("--translation_batch_api", action="store_true",
+                           help="Translate through the OpenAI Batch API: half the cost, but results "
+                                "can take up to 24 hours (endpoint must support /v1/batches)")
         parser.add_argument("--output_translated_text",
                            help="Optional: Save translated text to file (auto-generated if not specified)")
         parser.add_argument("--disable_auto_translation_save", action="store_true",
@@ -70,13 +148,50 @@ class CLIArgumentParser:
         # Progress management
         parser.add_argument("--progress_file", default="ocr_progress.json",
                            help="Path to progress tracking file (default: ocr_progress.json)")
+        parser.add_argument("--save_every", type=int, default=5, metavar="N",
+                           help="Save OCR progress after every N processed images (default: 5)")
+        parser.add_argument("--pretty_progress", action="store_true",
+                           help="Write the progress file indented for reading (slower on large books)")
         parser.add_argument("--show_progress", action="store_true",
                            help="Show summary of saved progress sessions and exit")
         parser.add_argument("--cleanup_progress", type=int, metavar="DAYS",
                            help="Clean up progress sessions older than DAYS and exit")
         
+        # Logging
+        CLIArgumentParser.add_logging_arguments(parser)
+        
+        return parser
+    
+    @staticmethod
+    def create_admin_parser() -> argparse.ArgumentParser:
+        """Create a minimal parser for the progress file commands."""
+        parser = argparse.ArgumentParser(description="Manage saved OCR progress")
+        parser.add_argument("--progress_file", default="ocr_progress.json",
+                           help="Path to progress tracking file (default: ocr_progress.json)")
+        parser.add_argument("--show_progress", action="store_true",
+                           help="Show summary of saved progress sessions and exit")
+        parser.add_argument("--cleanup_progress", type=int, metavar="DAYS",
+                           help="Clean up progress sessions older than DAYS and exit")
+        parser.add_argument("--pretty_progress", action="store_true",
+                           help="Write the progress file indented for reading (slower on large books)")
+        CLIArgumentParser.add_logging_arguments(parser)
         return parser
     
+    @staticmethod
+    def add_logging_arguments(parser: argparse.ArgumentParser) -> None:
+        """Add the log output options to a parser."""
+        parser.add_argument("--log_level", choices=LOG_LEVELS, default="INFO",
+                           help="Minimum level of log messages to show (default: INFO)")
+        parser.add_argument("--quiet", action="store_true",
+                           help="Only show warnings and errors in the log output")
+    
+    @staticmethod
+    def is_admin_command(argv: list) -> bool:
+        """Check whether the arguments request a progress file command."""
+        if '-h' in argv or '--help' in argv:
+            return False
+        return any(arg.split('=', 1)[0] in ADMIN_FLAGS for arg in argv)
+    
     @staticmethod
     def validate_arguments(args) -> None:
         """
@@ -92,6 +207,37 @@ class CLIArgumentParser:
         if args.show_progress or args.cleanup_progress is not None:
             return
         
+        if args.requests_per_second is not None and args.requests_per_second <= 0:
+            print("Error: --requests_per_second must be positive")
+            sys.exit(1)
+        
+        if args.save_every < 1:
+            print("Error: --save_every must be at least 1")
+            sys.exit(1)
+        
+        if args.max_concurrency < 1:
+            print("Error: --max_concurrency/--ocr_concurrency must be at least 1")
+            sys.exit(1)
+        
+        if args.translation_batch_api and args.streaming:
+            print("Error: --translation_batch_api can't be combined with --streaming")
+            sys.exit(1)
+        
+        if args.tts_concurrency < 1:
+            print("Error: --tts_concurrency must be at least 1")
+            sys.exit(1)
+        
+        if args.max_image_dim is not None and args.max_image_dim < 1:
+            print("Error: --max_image_dim must be at least 1")
+            sys.exit(1)
+        
+        if args.image_transport == "url" and not args.image_url_template:
+            print("Error: --image_transport url requires --image_url_template")
+            sys.exit(1)
+        
+        if args.model_name.partition(":")[0].lower() in LOCAL_OCR_BACKENDS:
+            CLIArgumentParser._validate_local_ocr(args)
+        
         # Validate required arguments for normal processing
         if not args.output_audio:
             print("Error: --output_audio is required for processing")
@@ -111,6 +257,36 @@ class CLIArgumentParser:
             if not os.path.isdir(args.input_dir):
                 print(f"Error: Input directory does not exist: {args.input_dir}")
                 sys.exit(1)
+    
+    
+    @staticmethod
+    def _validate_local_ocr(args) -> None:
+        """
+        Check that the API steps of a run with local OCR have a model and a token.
+        
+        Args:
+            args: Parsed command-line arguments
+            
+        Raises:
+            SystemExit: If cleaning or translation has no model or token to use
+        """
+        if args.start_from == "tts":
+            return
+        needs_cleaning = not args.skip_cleaning
+        needs_translation = not args.skip_translation
+        
+        if needs_cleaning and not args.llm_model:
+            print(f"Error: --model_name {args.model_name} runs OCR locally, so cleaning needs an "
+                  "API model: pass --llm_model, or --skip_cleaning")
+            sys.exit(1)
+        if needs_translation and not (args.translation_model or args.llm_model):
+            print(f"Error: --model_name {args.model_name} runs OCR locally, so translation needs an "
+                  "API model: pass --translation_model or --llm_model, or --skip_translation")
+            sys.exit(1)
+        if (needs_cleaning or needs_translation) and not os.path.exists(args.token_path):
+            print(f"Error: Cleaning and translation use the API, but no token was found at "
+                  f"{args.token_path}; pass --skip_cleaning and --skip_translation to run fully locally")
+            sys.exit(1)
 
 
 class CLIInterface:
@@ -118,7 +294,14 @@ class CLIInterface:
     
     def __init__(self):
         """Initialize CLI interface."""
-        self.parser = CLIArgumentParser.create_parser()
+        self._parser: Optional[argparse.ArgumentParser] = None
+    
+    @property
+    def parser(self) -> argparse.ArgumentParser:
+        """Lazily build the full argument parser."""
+        if self._parser is None:
+            self._parser = CLIArgumentParser.create_parser()
+        return self._parser
     
     def parse_arguments(self, argv: Optional[list] = None) -> argparse.Namespace:
         """
@@ -130,8 +313,31 @@ class CLIInterface:
         Returns:
             Parsed arguments
         """
-        args = self.parser.parse_args(argv)
-        CLIArgumentParser.validate_arguments(args)
+        if argv is None:
+            argv = sys.argv[1:]
+        
+        # Progress commands don't need the full parser or its validation
+        if CLIArgumentParser.is_admin_command(argv):
+            args = self._fast_admin_parse(argv)
+        else:
+            args = self.parser.parse_args(argv)
+            CLIArgumentParser.validate_arguments(args)
+        
+        setup_logging("WARNING" if args.quiet else args.log_level)
+        return args
+    
+    @staticmethod
+    def _fast_admin_parse(argv: list) -> argparse.Namespace:
+        """
+        Parse arguments for the progress file commands only.
+        
+        Args:
+            argv: Argument list
+            
+        Returns:
+            Parsed arguments (other processing options are ignored)
+        """
+        args, _ = CLIArgumentParser.create_admin_parser().parse_known_args(argv)
         return args
     
     def create_config_from_args(self, args: argparse.Namespace) -> PipelineConfig:
@@ -144,4 +350,6 @@ class CLIInterface:
         Returns:
             Pipeline configuration
         """
-        return PipelineConfig.from_args(args)
+        config = PipelineConfig.from_args(args)
+        FileManager.prepare_output_directories(config.output_paths)
+        return config
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Shared API clients for the OCR, cleaning and translation services.
+
+All services talking to the same endpoint use one client pair, so requests
+reuse pooled keep-alive connections instead of opening a new TLS connection
+each. HTTP/2 is used when the ``h2`` package is installed.
+"""
+
+import importlib.util
+from typing import Dict, Optional, Tuple
+
+from openai import AsyncOpenAI, OpenAI
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# How long idle pooled connections are kept open (seconds)
+KEEPALIVE_EXPIRY = 60.0
+
+# Connect/read timeout of the startup connection check (seconds)
+VALIDATION_TIMEOUT = 3.0
+
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class ClientFactory:
+    """Creates API clients, one sync/async pair per endpoint, from a token file."""
+    
+    def __init__(self, token_path: str, max_connections: int = 8):
+        """
+        Initialize client factory.
+        
+        Args:
+            token_path: Path to the GitHub token file
+            max_connections: Size of each client's connection pool
+        """
+        self.token_path = token_path
+        self.max_connections = max_connections
+        self._token: Optional[str] = None
+        self._clients: Dict[str, Tuple[OpenAI, AsyncOpenAI]] = {}
+    
+    def read_token(self) -> str:
+        """
+        Read the API token (once).
+        
+        Returns:
+            API token
+            
+        Raises:
+            FileNotFoundError: If the token file doesn't exist
+        """
+        if self._token is None:
+            try:
+                with open(self.token_path, "r") as file:
+                    token = file.read().strip()
+                
+                if not token:
+                    raise ValueError("GitHub token is empty")
+            
+            except FileNotFoundError:
+                raise FileNotFoundError(f"GitHub token not found at {self.token_path}")
+            except Exception as e:
+                raise Exception(f"Error reading GitHub token: {str(e)}")
+            
+            self._token = token
+        return self._token
+    
+    def _http_client_options(self) -> dict:
+        """Connection pool options shared by the sync and async HTTP clients."""
+        return {
+            "http2": _HTTP2_AVAILABLE,
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=KEEPALIVE_EXPIRY
+            )
+        }
+    
+    def get_clients(self, endpoint: str) -> Tuple[OpenAI, AsyncOpenAI]:
+        """
+        Get the clients for an endpoint, creating them on first use.
+        
+        Args:
+            endpoint: API endpoint URL
+            
+        Returns:
+            Tuple of (sync client, async client)
+        """
+        if endpoint not in self._clients:
+            token = self.read_token()
+            if httpx is not None:
+                options = self._http_client_options()
+                client = OpenAI(
+                    base_url=endpoint, api_key=token, http_client=httpx.Client(**options)
+                )
+                async_client = AsyncOpenAI(
+                    base_url=endpoint, api_key=token, http_client=httpx.AsyncClient(**options)
+                )
+            else:
+                client = OpenAI(base_url=endpoint, api_key=token)
+                async_client = AsyncOpenAI(base_url=endpoint, api_key=token)
+            self._clients[endpoint] = (client, async_client)
+        return self._clients[endpoint]
+    
+    @staticmethod
+    def validate_connection(client: OpenAI, endpoint: str) -> None:
+        """
+        Check that the endpoint is reachable by listing its models.
+        
+        The check gives up after ``VALIDATION_TIMEOUT`` seconds without retrying,
+        so an unreachable endpoint doesn't stall startup.
+        
+        Args:
+            client: Client for the endpoint
+            endpoint: API endpoint URL (for the message)
+        """
+        try:
+            timeout = httpx.Timeout(VALIDATION_TIMEOUT) if httpx is not None else VALIDATION_TIMEOUT
+            models = client.with_options(timeout=timeout, max_retries=0).models.list()
+            print(f"✓ Successfully connected to {endpoint}. Models available: {len(models.data)}")
+        except Exception as e:
+            print(f"⚠️  Warning: Could not validate API connection: {str(e)}")
+            print("Proceeding anyway, but you may encounter errors during processing.")
@@ -1,12 +1,23 @@
 #!/usr/bin/env python3
 """
 Configuration management for the Book OCR to TTS Pipeline.
+
+Configurations are immutable (use ``dataclasses.replace`` to derive a
+modified copy), which also makes them hashable.
 """
 
+from collections import namedtuple
 from dataclasses import dataclass
+from functools import cache
+from typing import FrozenSet, Optional
+
+from file_manager import FileManager
 
+# Model names that select a local OCR engine instead of a remote API
+LOCAL_OCR_BACKENDS = ("tesseract",)
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class OCRConfig:
     """Configuration for OCR operations."""
     github_token_path: str = "access_token/github_pat"
@@ -14,40 +25,81 @@ class OCRConfig:
     model_name: str = "openai/o4-mini"
     max_retries: int = 3
     delay_seconds: float = 1.0
+    max_concurrency: int = 4  # Maximum number of in-flight OCR requests
+    min_backoff: float = 1.0  # Wait after the first failed attempt (seconds)
+    max_backoff: float = 60.0  # Upper bound for exponential backoff (seconds)
+    cache_dir: Optional[str] = ".ocr_cache"  # OCR result cache (None disables caching)
+    requests_per_second: Optional[float] = None  # Overrides the rate implied by delay_seconds
+    validate_on_startup: bool = False  # List the endpoint's models before the first OCR request
+    image_transport: str = "base64"  # "base64" (inline data URL) or "url" (see image_url_template)
+    image_url_template: Optional[str] = None  # e.g. "https://host/pages/{name}", {name} = image file name
+    max_image_dim: Optional[int] = None  # Downscale larger images to this many pixels (longest edge)
+    llm_model: Optional[str] = None  # Model for cleaning (and translation); defaults to model_name for API OCR
+    
+    @property
+    def is_local_ocr(self) -> bool:
+        """Whether model_name selects a local OCR engine."""
+        return self.model_name.partition(":")[0].lower() in LOCAL_OCR_BACKENDS
+    
+    @property
+    def text_model(self) -> Optional[str]:
+        """Model for the LLM text steps, or None if local OCR leaves no model to use."""
+        if self.llm_model:
+            return self.llm_model
+        return None if self.is_local_ocr else self.model_name
+    
+    @property
+    def request_rate(self) -> Optional[float]:
+        """Average number of OCR requests allowed per second (None for unlimited)."""
+        if self.requests_per_second:
+            return self.requests_per_second
+        # delay_seconds is kept for backward compatibility as the interval between requests
+        return 1.0 / self.delay_seconds if self.delay_seconds > 0 else None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TTSConfig:
     """Configuration for Text-to-Speech operations."""
     voice: str = "en-US-JennyNeural"
     audio_bitrate: str = "48k"
     max_chunk_size: int = 5000
+    max_concurrency: int = 8  # Chunks synthesized at the same time
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ProcessingConfig:
     """Configuration for text processing."""
     skip_cleaning: bool = False
     enable_auto_text_save: bool = True
     progress_file: str = "ocr_progress.json"
+    save_every: int = 5  # Save OCR progress after this many images (and when stopping)
+    clean_chunk_size: int = 6000  # Characters per cleaning request (roughly 1500 tokens)
+    streaming: bool = False  # Overlap OCR, cleaning, translation and TTS instead of running them in turn
+    pretty_progress: bool = False  # Indent the progress file for reading (slower saves)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TranslationConfig:
     """Configuration for translation operations."""
     source_language: str = "auto"  # "auto" for automatic detection
     target_language: str = "English"
     skip_translation: bool = True  # Skip translation by default
     enable_auto_translation_save: bool = True
+    max_batch_tokens: int = 3000  # Paragraphs are packed into requests of up to this many tokens
+    max_batch_sections: int = 8  # ... and at most this many paragraphs (more markers get lost more often)
+    endpoint: Optional[str] = None  # API endpoint for translation (defaults to the OCR endpoint)
+    model_name: Optional[str] = None  # Translation model (defaults to OCRConfig.text_model)
+    use_batch_api: bool = False  # Submit all requests as one OpenAI Batch API job (cheaper, slower)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PipelineConfig:
     """Main configuration container for the pipeline."""
     ocr: OCRConfig
     tts: TTSConfig
     processing: ProcessingConfig
     translation: TranslationConfig
+    output_paths: FrozenSet[str] = frozenset()  # Every file the run may write
     
     @classmethod
     def create_default(cls) -> 'PipelineConfig':
@@ -62,27 +114,93 @@ class PipelineConfig:
     @classmethod
     def from_args(cls, args) -> 'PipelineConfig':
         """Create configuration from command line arguments."""
-        return cls(
-            ocr=OCRConfig(
-                github_token_path=args.token_path,
-                endpoint=args.endpoint,
-                model_name=args.model_name,
-                max_retries=args.max_retries,
-                delay_seconds=args.delay
-            ),
-            tts=TTSConfig(
-                voice=args.voice,
-                audio_bitrate=args.audio_bitrate
-            ),
-            processing=ProcessingConfig(
-                skip_cleaning=args.skip_cleaning,
-                enable_auto_text_save=not args.disable_auto_text_save,
-                progress_file=args.progress_file
-            ),
-            translation=TranslationConfig(
-                source_language=getattr(args, 'source_language', 'auto'),
-                target_language=getattr(args, 'target_language', 'English'),
-                skip_translation=getattr(args, 'skip_translation', True),
-                enable_auto_translation_save=not getattr(args, 'disable_auto_translation_save', False)
-            )
-        )
+        key = _ArgKey(**{
+            field: getattr(args, field, default)
+            for field, default in _ArgKey._field_defaults.items()
+        })
+        return _build_config(key)
+
+
+_DEFAULT_OCR = OCRConfig()
+_DEFAULT_TTS = TTSConfig()
+_DEFAULT_PROCESSING = ProcessingConfig()
+_DEFAULT_TRANSLATION = TranslationConfig()
+
+# The command line arguments that feed PipelineConfig, with the values used when absent.
+# A hashable snapshot of them lets identical argument sets share one (immutable) config.
+_ArgKey = namedtuple('_ArgKey', [
+    'token_path', 'endpoint', 'model_name', 'max_retries', 'delay', 'max_concurrency',
+    'cache_dir', 'no_cache', 'requests_per_second', 'voice', 'audio_bitrate', 'skip_cleaning',
+    'disable_auto_text_save', 'progress_file', 'save_every', 'source_language', 'target_language',
+    'skip_translation', 'disable_auto_translation_save', 'output_audio', 'output_text',
+    'output_raw_text', 'output_cleaned_text', 'output_translated_text', 'streaming',
+    'image_transport', 'image_url_template', 'max_image_dim', 'validate_connection',
+    'translation_endpoint', 'translation_model', 'pretty_progress', 'tts_concurrency',
+    'translation_batch_api', 'llm_model'
+], defaults=[
+    _DEFAULT_OCR.github_token_path, _DEFAULT_OCR.endpoint, _DEFAULT_OCR.model_name,
+    _DEFAULT_OCR.max_retries, _DEFAULT_OCR.delay_seconds, _DEFAULT_OCR.max_concurrency,
+    _DEFAULT_OCR.cache_dir, False, None, _DEFAULT_TTS.voice, _DEFAULT_TTS.audio_bitrate,
+    _DEFAULT_PROCESSING.skip_cleaning, False, _DEFAULT_PROCESSING.progress_file,
+    _DEFAULT_PROCESSING.save_every,
+    'auto', 'English', True, False, None, None, None, None, None, _DEFAULT_PROCESSING.streaming,
+    _DEFAULT_OCR.image_transport, None, _DEFAULT_OCR.max_image_dim,
+    _DEFAULT_OCR.validate_on_startup, None, None, _DEFAULT_PROCESSING.pretty_progress,
+    _DEFAULT_TTS.max_concurrency, _DEFAULT_TRANSLATION.use_batch_api,
+    _DEFAULT_OCR.llm_model
+])
+
+
+def _collect_output_paths(key: _ArgKey) -> FrozenSet[str]:
+    """Collect the explicit and auto-generated output file paths of a run."""
+    paths = {key.output_audio, key.output_text, key.output_raw_text,
+             key.output_cleaned_text, key.output_translated_text}
+    if key.output_audio:
+        paths.update(FileManager.generate_text_output_paths(key.output_audio))
+        paths.add(FileManager.generate_translation_text_path(key.output_audio, key.target_language))
+    return frozenset(path for path in paths if path)
+
+
+@cache
+def _build_config(key: _ArgKey) -> PipelineConfig:
+    """Build the configuration for a snapshot of command line arguments."""
+    return PipelineConfig(
+        ocr=OCRConfig(
+            github_token_path=key.token_path,
+            endpoint=key.endpoint,
+            model_name=key.model_name,
+            max_retries=key.max_retries,
+            delay_seconds=key.delay,
+            max_concurrency=key.max_concurrency,
+            cache_dir=None if key.no_cache else key.cache_dir,
+            requests_per_second=key.requests_per_second,
+            image_transport=key.image_transport,
+            image_url_template=key.image_url_template,
+            max_image_dim=key.max_image_dim,
+            validate_on_startup=key.validate_connection,
+            llm_model=key.llm_model
+        ),
+        tts=TTSConfig(
+            voice=key.voice,
+            audio_bitrate=key.audio_bitrate,
+            max_concurrency=key.tts_concurrency
+        ),
+        processing=ProcessingConfig(
+            skip_cleaning=key.skip_cleaning,
+            enable_auto_text_save=not key.disable_auto_text_save,
+            progress_file=key.progress_file,
+            save_every=key.save_every,
+            streaming=key.streaming,
+            pretty_progress=key.pretty_progress
+        ),
+        translation=TranslationConfig(
+            source_language=key.source_language,
+            target_language=key.target_language,
+            skip_translation=key.skip_translation,
+            enable_auto_translation_save=not key.disable_auto_translation_save,
+            endpoint=key.translation_endpoint,
+            model_name=key.translation_model,
+            use_batch_api=key.translation_batch_api
+        ),
+        output_paths=_collect_output_paths(key)
+    )
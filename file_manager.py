@@ -3,16 +3,55 @@
 File management utilities for the pipeline.
 """
 
+import asyncio
+import logging
 import os
-import glob
 import hashlib
-from typing import List, Tuple
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Iterable, List, Set, Tuple
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+logger = logging.getLogger(__name__)
+
+# Characters replaced with "_" when a language name is used in a file name
+_LANG_TRANSLATE = str.maketrans({" ": "_", "-": "_"})
+
+# Directories already created (or verified) during this run
+_ENSURED_DIRS: Set[str] = set()
+
+
+@lru_cache(maxsize=8)
+def _scan_image_files(directory: str, mtime_ns: int) -> Tuple[str, ...]:
+    """
+    List image files in a directory with a single scan.
+    
+    The directory's mtime is part of the cache key, so adding or removing
+    files invalidates the cached listing.
+    """
+    with os.scandir(directory) as entries:
+        image_files = [
+            entry.path for entry in entries
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in FileManager.IMAGE_EXTENSIONS
+        ]
+    # Sort files to maintain order
+    image_files.sort()
+    return tuple(image_files)
 
 
 class FileManager:
     """Handles file operations for the pipeline."""
     
-    IMAGE_EXTENSIONS = ['*.jpg', '*.jpeg', '*.png', '*.bmp', '*.tiff', '*.webp']
+    IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.webp'})
+    
+    # File hashes only identify images for progress tracking, so a fast
+    # non-cryptographic hash is enough (blake2b is the stdlib fallback)
+    FILE_HASH_ALGORITHM = "xxh3_64" if xxhash is not None else "blake2b"
+    HASH_CHUNK_SIZE = 1 << 20  # 1 MiB
     
     @staticmethod
     def get_image_files(directory: str) -> List[str]:
@@ -31,18 +70,12 @@ class FileManager:
         if not os.path.isdir(directory):
             raise ValueError(f"Directory does not exist: {directory}")
         
-        image_files = []
-        
-        for ext in FileManager.IMAGE_EXTENSIONS:
-            image_files.extend(glob.glob(os.path.join(directory, ext), recursive=False))
-            image_files.extend(glob.glob(os.path.join(directory, ext.upper()), recursive=False))
+        image_files = list(_scan_image_files(directory, os.stat(directory).st_mtime_ns))
         
         if not image_files:
             raise ValueError(f"No image files found in {directory}")
         
-        # Sort files to maintain order
-        image_files.sort()
-        print(f"Found {len(image_files)} image files")
+        logger.info("Found %d image files", len(image_files), extra={"path": directory})
         return image_files
     
     @staticmethod
@@ -50,15 +83,28 @@ class FileManager:
         """
         Create a hash of the file for tracking purposes.
         
+        The file is streamed in chunks, so memory use doesn't grow with image size.
+        
         Args:
             filepath: Path to the file
             
         Returns:
-            MD5 hash of the file content
+            Hex digest of the file content (see FILE_HASH_ALGORITHM)
         """
+        if xxhash is not None:
+            new_hasher = xxhash.xxh3_64
+        else:
+            new_hasher = partial(hashlib.blake2b, digest_size=16)
+        
         with open(filepath, 'rb') as f:
-            file_hash = hashlib.md5(f.read()).hexdigest()
-        return file_hash
+            if hasattr(hashlib, 'file_digest'):
+                # Python 3.11+: reads into one reusable buffer instead of allocating per chunk
+                return hashlib.file_digest(f, new_hasher).hexdigest()
+            
+            hasher = new_hasher()
+            for chunk in iter(lambda: f.read(FileManager.HASH_CHUNK_SIZE), b''):
+                hasher.update(chunk)
+        return hasher.hexdigest()
     
     @staticmethod
     def save_text(text: str, output_path: str) -> None:
@@ -69,12 +115,22 @@ class FileManager:
             text: Text content to save
             output_path: Path where to save the file
         """
-        # Ensure output directory exists
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        # Ensure output directory exists (free for directories prepared at startup)
+        FileManager.ensure_directory_exists(output_path)
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(text)
-        print(f"Text saved to: {output_path}")
+        Path(output_path).write_text(text, encoding='utf-8')
+        logger.info("Text saved to: %s", output_path, extra={"path": output_path})
+    
+    @staticmethod
+    async def save_text_async(text: str, output_path: str) -> None:
+        """
+        Save text to file without blocking the event loop.
+        
+        Args:
+            text: Text content to save
+            output_path: Path where to save the file
+        """
+        await asyncio.to_thread(FileManager.save_text, text, output_path)
     
     @staticmethod
     def load_text(file_path: str) -> str:
@@ -92,9 +148,20 @@ class FileManager:
             Exception: If there's an error reading the file
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text = f.read()
-            print(f"✅ Loaded text from {file_path} ({len(text):,} characters)")
+            # Read raw bytes in one go and decode once, instead of going through
+            # the incremental text decoder
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            text = data.decode('utf-8')
+            
+            # Keep the universal newline behaviour of text mode
+            if '\r' in text:
+                text = text.replace('\r\n', '\n').replace('\r', '\n')
+            
+            logger.info(
+                "✅ Loaded text from %s (%s bytes, %s characters)",
+                file_path, f"{len(data):,}", f"{len(text):,}", extra={"path": file_path}
+            )
             return text
         except FileNotFoundError:
             raise FileNotFoundError(f"Text file not found: {file_path}")
@@ -126,8 +193,25 @@ class FileManager:
             file_path: Path to a file (directory will be created if needed)
         """
         directory = os.path.dirname(file_path)
-        if directory:
+        if directory and directory not in _ENSURED_DIRS:
             os.makedirs(directory, exist_ok=True)
+            _ENSURED_DIRS.add(directory)
+    
+    @staticmethod
+    def prepare_output_directories(file_paths: Iterable[str]) -> None:
+        """
+        Create the directories of all output files up front.
+        
+        Later saves then skip the directory check, and problems such as missing
+        permissions surface before any processing starts.
+        
+        Args:
+            file_paths: Paths of the files that may be written
+        """
+        for directory in {os.path.dirname(path) for path in file_paths} - _ENSURED_DIRS:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+                _ENSURED_DIRS.add(directory)
     
     @staticmethod
     def generate_translation_text_path(output_audio: str, target_language: str) -> str:
@@ -143,6 +227,6 @@ class FileManager:
         """
         base_path = os.path.splitext(output_audio)[0]  # Remove extension
         # Create a safe filename for the language
-        safe_language = target_language.lower().replace(" ", "_").replace("-", "_")
+        safe_language = target_language.lower().translate(_LANG_TRANSLATE)
         translated_text_path = f"{base_path}_translated_{safe_language}.txt"
         return translated_text_path
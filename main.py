@@ -14,33 +14,42 @@ Usage:
 import asyncio
 import sys
 import os
+from typing import List, Optional
 
-# Handle both direct execution and module import
-if __name__ == "__main__":
+# Handle both package import and direct execution / import from the entry scripts
+if not __package__:
     # Add current directory to path for direct execution
     sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
     from cli import CLIInterface
-    from pipeline import BookOCRTTSPipeline
     from progress_tracker import ProgressTracker
     from file_manager import FileManager
+    from result_cache import OCRCache, create_cache_backend
 else:
     from .cli import CLIInterface
-    from .pipeline import BookOCRTTSPipeline
     from .progress_tracker import ProgressTracker
     from .file_manager import FileManager
+    from .result_cache import OCRCache, create_cache_backend
 
 
-async def main():
-    """Main application entry point."""
+async def run(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the pipeline.
+    
+    Args:
+        argv: Command-line arguments (defaults to sys.argv[1:])
+        
+    Returns:
+        Process exit code
+    """
     try:
         # Parse command-line arguments
         cli = CLIInterface()
-        args = cli.parse_arguments()
+        args = cli.parse_arguments(argv)
         
         # Handle special commands that don't require full processing
         if args.show_progress or args.cleanup_progress is not None:
             # Create a minimal progress tracker for these operations
-            progress_tracker = ProgressTracker(args.progress_file)
+            progress_tracker = ProgressTracker(args.progress_file, indent=args.pretty_progress)
             
             if args.show_progress:
                 progress_tracker.show_progress_summary()
@@ -48,19 +57,64 @@ async def main():
             if args.cleanup_progress is not None:
                 progress_tracker.cleanup_old_sessions(args.cleanup_progress)
             
-            return
+            return 0
         
-        # Ensure output directory exists
-        FileManager.ensure_directory_exists(args.output_audio)
+        # Imported here so the progress commands above don't load the API clients
+        if __package__:
+            from .pipeline import BookOCRTTSPipeline
+        else:
+            from pipeline import BookOCRTTSPipeline
         
-        # Create pipeline configuration
+        # Create pipeline configuration (also creates the output directories)
         config = cli.create_config_from_args(args)
         
+        if args.clear_cache:
+            OCRCache.clear(create_cache_backend(args.cache_dir))
+        
         # Initialize pipeline
         print("Initializing OCR to TTS pipeline...")
         pipeline = BookOCRTTSPipeline(config)
         
         combined_text = None
+        raw_text_streamed = False
+        
+        # Raw OCR text is streamed to disk while images are processed
+        ocr_raw_text_path = None
+        if config.processing.enable_auto_text_save:
+            ocr_raw_text_path = args.output_raw_text
+            if not ocr_raw_text_path:
+                ocr_raw_text_path, _ = FileManager.generate_text_output_paths(args.output_audio)
+        
+        # Overlap all steps, starting each one on the first pages OCR produces
+        if config.processing.streaming and args.start_from == "ocr":
+            print(f"\nExtracting, processing and speaking text from {args.input_dir} (streaming)")
+            if args.no_resume:
+                print("🔄 Starting fresh (resume disabled)")
+            
+            cleaned_text_path = translated_text_path = None
+            if config.processing.enable_auto_text_save:
+                cleaned_text_path = (args.output_cleaned_text or
+                                     FileManager.generate_text_output_paths(args.output_audio)[1])
+            if config.translation.enable_auto_translation_save:
+                translated_text_path = (args.output_translated_text or
+                                        FileManager.generate_translation_text_path(
+                                            args.output_audio, config.translation.target_language
+                                        ))
+            
+            final_text = await pipeline.process_streaming(
+                input_dir=args.input_dir,
+                output_audio=args.output_audio,
+                resume=not args.no_resume,
+                raw_text_path=ocr_raw_text_path,
+                cleaned_text_path=cleaned_text_path,
+                translated_text_path=translated_text_path
+            )
+            if args.output_text:
+                await FileManager.save_text_async(final_text, args.output_text)
+            
+            print("\nPipeline completed successfully!")
+            print(f"🎵 Audio output: {args.output_audio}")
+            return 0
         
         # Handle TTS-only mode with text file input
         if args.start_from == "tts" and args.input_text:
@@ -73,10 +127,12 @@ async def main():
             if args.no_resume:
                 print("🔄 Starting fresh (resume disabled)")
             
-            combined_text = pipeline.process_images_to_text(
+            combined_text = await pipeline.process_images_to_text(
                 input_dir=args.input_dir,
-                resume=not args.no_resume
+                resume=not args.no_resume,
+                raw_text_path=ocr_raw_text_path
             )
+            raw_text_streamed = ocr_raw_text_path is not None
         
         # Try to load existing text if starting from cleaning or translation
         elif args.start_from in ["cleaning", "translation"]:
@@ -86,31 +142,33 @@ async def main():
             if not combined_text:
                 print("❌ No completed OCR session found. Running OCR step first...")
                 print(f"\nStep 1: Extracting text from images in {args.input_dir}")
-                combined_text = pipeline.process_images_to_text(
+                combined_text = await pipeline.process_images_to_text(
                     input_dir=args.input_dir,
-                    resume=not args.no_resume
+                    resume=not args.no_resume,
+                    raw_text_path=ocr_raw_text_path
                 )
+                raw_text_streamed = ocr_raw_text_path is not None
         
         if not combined_text or not combined_text.strip():
             print("Error: No text was extracted from images")
-            sys.exit(1)
+            return 1
         
-        # Auto-save raw OCR text (unless disabled)
-        if (config.processing.enable_auto_text_save and 
+        # Auto-save raw OCR text (unless disabled, or already written page by page during OCR)
+        if (config.processing.enable_auto_text_save and not raw_text_streamed and
             args.start_from in ["ocr", "cleaning", "translation"]):
             raw_text_path = args.output_raw_text
             if not raw_text_path:
                 raw_text_path, _ = FileManager.generate_text_output_paths(args.output_audio)
             
             print(f"💾 Saving raw OCR text to: {raw_text_path}")
-            FileManager.save_text(combined_text, raw_text_path)
+            await FileManager.save_text_async(combined_text, raw_text_path)
         
         cleaned_text = combined_text
         
         # Step 2: Clean the extracted text (if not skipped and not starting from TTS)
         if args.start_from not in ["tts"] and not config.processing.skip_cleaning:
             print("\nStep 2: Cleaning extracted text...")
-            cleaned_text = pipeline.clean_text(combined_text)
+            cleaned_text = await pipeline.clean_text(combined_text)
             
             # Auto-save cleaned text (unless disabled)
             if config.processing.enable_auto_text_save:
@@ -119,7 +177,7 @@ async def main():
                     _, cleaned_text_path = FileManager.generate_text_output_paths(args.output_audio)
                 
                 print(f"💾 Saving cleaned text to: {cleaned_text_path}")
-                FileManager.save_text(cleaned_text, cleaned_text_path)
+                await FileManager.save_text_async(cleaned_text, cleaned_text_path)
                 
         elif config.processing.skip_cleaning:
             print("\nStep 2: Skipping text cleaning (using raw OCR output)")
@@ -130,7 +188,7 @@ async def main():
         translated_text = cleaned_text
         if args.start_from not in ["tts"] and not config.translation.skip_translation:
             print(f"\nStep 3: Translating text from {config.translation.source_language} to {config.translation.target_language}...")
-            translated_text = pipeline.translate_text(
+            translated_text = await pipeline.translate_text(
                 cleaned_text, 
                 config.translation.source_language, 
                 config.translation.target_language
@@ -145,7 +203,7 @@ async def main():
                     )
                 
                 print(f"💾 Saving translated text to: {translated_text_path}")
-                FileManager.save_text(translated_text, translated_text_path)
+                await FileManager.save_text_async(translated_text, translated_text_path)
                 
         elif config.translation.skip_translation:
             print("\nStep 3: Skipping translation (using cleaned text)")
@@ -154,7 +212,7 @@ async def main():
         
         # Step 4: Save text if requested
         if args.output_text:
-            FileManager.save_text(translated_text, args.output_text)
+            await FileManager.save_text_async(translated_text, args.output_text)
         
         # Step 5: Convert to speech
         if args.start_from in ["ocr", "cleaning", "translation", "tts"]:
@@ -180,11 +238,30 @@ async def main():
         
         if args.output_text:
             print(f"📝 Final text output: {args.output_text}")
+        
+        return 0
             
     except Exception as e:
         print(f"Error: {str(e)}")
-        sys.exit(1)
+        return 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Main application entry point.
+    
+    Args:
+        argv: Command-line arguments (defaults to sys.argv[1:])
+        
+    Returns:
+        Process exit code
+    """
+    try:
+        return asyncio.run(run(argv))
+    except KeyboardInterrupt:
+        # Progress has already been saved by the pipeline
+        return 130
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    sys.exit(main(sys.argv[1:]))
@@ -1,57 +1,210 @@
 #!/usr/bin/env python3
 """
 OCR service for extracting text from images using GitHub Models.
+
+Setting the model name to ``tesseract`` (or ``tesseract:<lang>``, e.g.
+``tesseract:eng+chi_sim``) runs OCR locally instead. Local OCR is CPU-bound, so
+pages are processed in a pool of worker processes rather than as concurrent
+API requests.
 """
 
+import asyncio
+import io
+import logging
+import mimetypes
 import os
-import base64
-from typing import Optional
-from openai import OpenAI
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    # SIMD-accelerated, several times faster than the stdlib on multi-MB scans
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+try:
+    # Pillow-SIMD is picked up transparently when installed in place of Pillow
+    from PIL import Image
+except ImportError:
+    Image = None
 
+from openai import AsyncOpenAI, OpenAI
+
+from client_factory import ClientFactory
 from config import OCRConfig
+from rate_limiter import TokenBucketRateLimiter
 from retry_handler import RetryHandler
 
+logger = logging.getLogger(__name__)
+
+
+# Bump when the OCR prompt changes, so cached results from the old prompt are not reused
+PROMPT_VERSION = 1
+
+# Quality of the JPEG sent in place of a downscaled image
+DOWNSCALED_JPEG_QUALITY = 85
+
+
+@dataclass(slots=True, frozen=True)
+class OCRError:
+    """Why OCR of an image failed."""
+    kind: str  # Exception class name, e.g. "RateLimitError"
+    message: str
+    status_code: Optional[int] = None
+    retry_after: Optional[float] = None  # Server-requested delay before trying again (seconds)
+    
+    @classmethod
+    def from_exception(cls, error: Exception) -> 'OCRError':
+        """Describe the exception that made OCR fail."""
+        return cls(
+            kind=type(error).__name__,
+            message=str(error),
+            status_code=RetryHandler.get_status_code(error),
+            retry_after=RetryHandler.get_retry_after(error)
+        )
+    
+    def __str__(self) -> str:
+        return f"{self.kind}: {self.message}"
+
+
+@dataclass(slots=True, frozen=True)
+class OCRResult:
+    """Text extracted from an image, or the error that prevented it."""
+    text: str = ""
+    error: Optional[OCRError] = None
+
+
+def _run_local_ocr(image_path: str, language: Optional[str]) -> str:
+    """
+    Run tesseract on a single image. Executed inside a worker process.
+    
+    Args:
+        image_path: Path to the image file
+        language: Tesseract language code(s), or None for the default
+        
+    Returns:
+        Extracted text content
+    """
+    import pytesseract
+    from PIL import Image
+    
+    with Image.open(image_path) as image:
+        if language:
+            return pytesseract.image_to_string(image, lang=language)
+        return pytesseract.image_to_string(image)
+
 
 class OCRService:
     """Handles OCR operations using GitHub Models."""
     
-    def __init__(self, config: OCRConfig):
+    def __init__(
+        self, 
+        config: OCRConfig, 
+        client_factory: Optional[ClientFactory] = None, 
+        limiter: Optional[TokenBucketRateLimiter] = None
+    ):
         """
         Initialize OCR service.
         
         Args:
             config: OCR configuration
+            client_factory: Source of the (shared) API clients; a private one is
+                created if omitted
+            limiter: Rate limiter shared with the other API calls; a private one
+                is created if omitted
         """
         self.config = config
+        self.client_factory = client_factory or ClientFactory(
+            config.github_token_path, config.max_concurrency * 2
+        )
         self.client: Optional[OpenAI] = None
-        self._setup_client()
+        self.async_client: Optional[AsyncOpenAI] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._connection_checked = False
+        self.limiter = limiter or TokenBucketRateLimiter(config.request_rate)
+        
+        self.is_local = config.is_local_ocr
+        self.local_language = config.model_name.partition(":")[2] or None
+        
+        if config.max_image_dim and Image is None and not self.is_local:
+            logger.warning("⚠️  Warning: Pillow is not installed, images are sent without downscaling")
+        
+        # Local OCR doesn't need the API, but cleaning/translation still use it if a token exists
+        if not self.is_local or os.path.exists(config.github_token_path):
+            self._setup_client()
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the worker pool for local OCR on first use."""
+        if self._executor is None:
+            workers = min(self.config.max_concurrency, os.cpu_count() or 1)
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        return self._executor
+    
+    def close(self) -> None:
+        """Shut down the local OCR worker pool, if one was started."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
     
     def _setup_client(self) -> None:
         """Setup GitHub Models client for OCR."""
-        try:
-            with open(self.config.github_token_path, "r") as file:
-                token = file.read().strip()
-            
-            if not token:
-                raise ValueError("GitHub token is empty")
-                
-        except FileNotFoundError:
-            raise FileNotFoundError(f"GitHub token not found at {self.config.github_token_path}")
-        except Exception as e:
-            raise Exception(f"Error reading GitHub token: {str(e)}")
+        # The async client is used for concurrent OCR requests
+        self.client, self.async_client = self.client_factory.get_clients(self.config.endpoint)
+    
+    def validate_connection(self) -> None:
+        """
+        Check the API connection once, before the first OCR request.
         
-        # Create client
-        self.client = OpenAI(base_url=self.config.endpoint, api_key=token)
+        A bad endpoint or token also shows up on the first real request, so the
+        extra round-trip only happens with ``validate_on_startup``, and never for
+        runs that don't OCR anything.
+        """
+        if self._connection_checked or self.is_local or self.client is None:
+            return
+        self._connection_checked = True
+        if self.config.validate_on_startup:
+            ClientFactory.validate_connection(self.client, self.config.endpoint)
+    
+    def _read_image(self, image_path: str) -> Tuple[bytes, str]:
+        """
+        Read an image for upload, downscaling it first if it exceeds ``max_image_dim``.
         
-        # Test the connection
-        try:
-            models = self.client.models.list()
-            print(f"✓ Successfully connected to {self.config.endpoint}. Models available: {len(models.data)}")
-        except Exception as e:
-            print(f"⚠️  Warning: Could not validate API connection: {str(e)}")
-            print("Proceeding anyway, but you may encounter errors during processing.")
+        Args:
+            image_path: Path to the image file
+            
+        Returns:
+            Tuple of (image bytes, MIME type)
+        """
+        if self.config.max_image_dim and Image is not None:
+            with Image.open(image_path) as image:
+                if max(image.size) > self.config.max_image_dim:
+                    return self._downscale_image(image), "image/jpeg"
+        
+        with open(image_path, "rb") as img_file:
+            return img_file.read(), mimetypes.guess_type(image_path)[0] or "image/jpeg"
     
-    def _encode_image_to_base64(self, image_path: str) -> str:
+    def _downscale_image(self, image) -> bytes:
+        """
+        Shrink an image to fit ``max_image_dim`` and re-encode it as JPEG.
+        
+        The model works on a much smaller resolution than a full-page scan, so
+        this cuts the upload without affecting the extracted text.
+        
+        Args:
+            image: Opened Pillow image
+            
+        Returns:
+            JPEG bytes
+        """
+        image = image.convert("RGB")
+        max_dim = self.config.max_image_dim
+        image.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=DOWNSCALED_JPEG_QUALITY)
+        return buffer.getvalue()
+    
+    def _encode_image_to_base64(self, image_path: str) -> Tuple[str, str]:
         """
         Encode image file to base64 string.
         
@@ -59,13 +212,70 @@ class OCRService:
             image_path: Path to the image file
             
         Returns:
-            Base64 encoded image string
+            Tuple of (base64 encoded image string, MIME type)
         """
-        with open(image_path, "rb") as img_file:
-            image_bytes = img_file.read()
-        return base64.b64encode(image_bytes).decode("utf-8")
+        image_bytes, mime_type = self._read_image(image_path)
+        # Don't keep a reference to the raw bytes, so they can be freed as soon as they're encoded
+        encoded = base64.b64encode(image_bytes)
+        del image_bytes
+        # The base64 alphabet is pure ASCII, which decodes faster than UTF-8
+        return encoded.decode("ascii"), mime_type
+    
+    def _get_image_url(self, image_path: str) -> str:
+        """
+        Get the URL the model reads an image from.
+        
+        Args:
+            image_path: Path to the image file
+            
+        Returns:
+            Hosted URL of the image (``url`` transport), or a base64 data URL
+        """
+        if self.config.image_transport == "url":
+            return self.config.image_url_template.format(name=os.path.basename(image_path))
+        
+        b64_image, mime_type = self._encode_image_to_base64(image_path)
+        return f"data:{mime_type};base64,{b64_image}"
+    
+    def _build_messages(self, image_url: str) -> List[Dict[str, Any]]:
+        """
+        Build the chat messages for an OCR request.
+        
+        Args:
+            image_url: URL (or data URL) of the image
+            
+        Returns:
+            Messages for the chat completion request
+        """
+        return [
+            {
+                "role": "developer",
+                "content": "You are a helpful assistant that specializes in optical character recognition (OCR). Extract all text from images accurately, maintaining the original structure and formatting as much as possible."
+            },
+            {
+                "role": "user", 
+                "content": [
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": image_url
+                        }
+                    },
+                    {
+                        "type": "text",
+                        "text": "Please extract all text from this image. Maintain the original structure, paragraph breaks, and formatting. If there are multiple columns, read from left to right, top to bottom. Only return the extracted text without any additional commentary."
+                    }
+                ]
+            }
+        ]
+    
+    @staticmethod
+    def _get_response_text(response) -> str:
+        """Get the stripped text content from a chat completion response."""
+        extracted_text = response.choices[0].message.content
+        return extracted_text.strip() if extracted_text else ""
     
-    def extract_text_from_image(self, image_path: str) -> str:
+    def extract_text_from_image(self, image_path: str) -> OCRResult:
         """
         Extract text from a single image using GitHub Models OCR.
         
@@ -73,59 +283,164 @@ class OCRService:
             image_path: Path to the image file
             
         Returns:
-            Extracted text content
+            OCR result (with ``error`` set if extraction failed)
             
         Raises:
             RuntimeError: If client is not initialized
         """
+        if self.is_local:
+            return self._extract_text_locally(image_path)
+        
         if not self.client:
             raise RuntimeError("GitHub client not initialized. Cannot perform OCR.")
-            
-        print(f"Processing: {os.path.basename(image_path)}")
+        self.validate_connection()
         
-        def _make_api_call():
-            b64_image = self._encode_image_to_base64(image_path)
-            
+        image_name = os.path.basename(image_path)
+        logger.info("Processing: %s", image_name)
+        
+        def _make_api_call(messages):
             # Type assertion - we've already checked self.client is not None above
             assert self.client is not None
-            response = self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "developer",
-                        "content": "You are a helpful assistant that specializes in optical character recognition (OCR). Extract all text from images accurately, maintaining the original structure and formatting as much as possible."
-                    },
-                    {
-                        "role": "user", 
-                        "content": [
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{b64_image}"
-                                }
-                            },
-                            {
-                                "type": "text",
-                                "text": "Please extract all text from this image. Maintain the original structure, paragraph breaks, and formatting. If there are multiple columns, read from left to right, top to bottom. Only return the extracted text without any additional commentary."
-                            }
-                        ]
-                    }
-                ],
+            return self.client.chat.completions.create(
+                messages=messages,
                 model=self.config.model_name
             )
-            return response
         
         try:
-            response = RetryHandler.retry_with_backoff(_make_api_call, self.config.max_retries)
+            # Encode once per image, not once per attempt
+            messages = self._build_messages(self._get_image_url(image_path))
+            response = RetryHandler.retry_with_backoff(
+                lambda: _make_api_call(messages),
+                max_retries=self.config.max_retries,
+                min_backoff=self.config.min_backoff,
+                max_backoff=self.config.max_backoff
+            )
+            extracted_text = self._get_response_text(response)
+            
+            logger.info("Extracted %s characters from %s", len(extracted_text), image_name)
+            return OCRResult(extracted_text)
+            
+        except Exception as e:
+            logger.error("Error processing %s after %s retries: %s", image_path, self.config.max_retries, e)
+            return OCRResult(error=OCRError.from_exception(e))
+    
+    async def prepare_messages_async(self, image_path: str) -> List[Dict[str, Any]]:
+        """
+        Read and encode an image into OCR request messages in a worker thread.
+        
+        Args:
+            image_path: Path to the image file
             
-            extracted_text = response.choices[0].message.content
-            if extracted_text:
-                extracted_text = extracted_text.strip()
-            else:
-                extracted_text = ""
+        Returns:
+            Messages for the chat completion request
+        """
+        if self.config.image_transport == "url":
+            return self._build_messages(self._get_image_url(image_path))
+        image_url = await asyncio.to_thread(self._get_image_url, image_path)
+        return self._build_messages(image_url)
+    
+    async def extract_text_from_image_async(
+        self, 
+        image_path: str, 
+        messages: Optional[List[Dict[str, Any]]] = None
+    ) -> OCRResult:
+        """
+        Extract text from a single image without blocking the event loop.
+        
+        Args:
+            image_path: Path to the image file
+            messages: Request messages from ``prepare_messages_async``, if the image
+                was already encoded
+            
+        Returns:
+            OCR result (with ``error`` set if extraction failed)
             
-            print(f"Extracted {len(extracted_text)} characters from {os.path.basename(image_path)}")
-            return extracted_text
+        Raises:
+            RuntimeError: If client is not initialized
+        """
+        if self.is_local:
+            return await self._extract_text_locally_async(image_path)
+        
+        if not self.async_client:
+            raise RuntimeError("GitHub client not initialized. Cannot perform OCR.")
+            
+        image_name = os.path.basename(image_path)
+        logger.info("Processing: %s", image_name)
+        
+        async def _make_api_call(messages):
+            # Type assertion - we've already checked self.async_client is not None above
+            assert self.async_client is not None
+            # Retries count against the request rate too
+            await self.limiter.acquire()
+            return await self.async_client.chat.completions.create(
+                messages=messages,
+                model=self.config.model_name
+            )
+        
+        try:
+            # Read and encode once per image (not per attempt), in a worker thread so
+            # the event loop keeps serving other requests
+            if messages is None:
+                messages = await self.prepare_messages_async(image_path)
+            response = await RetryHandler.retry_with_backoff_async(
+                lambda: _make_api_call(messages),
+                max_retries=self.config.max_retries,
+                min_backoff=self.config.min_backoff,
+                max_backoff=self.config.max_backoff
+            )
+            extracted_text = self._get_response_text(response)
+            
+            logger.info("Extracted %s characters from %s", len(extracted_text), image_name)
+            return OCRResult(extracted_text)
+            
+        except Exception as e:
+            logger.error("Error processing %s after %s retries: %s", image_path, self.config.max_retries, e)
+            return OCRResult(error=OCRError.from_exception(e))
+    
+    def _extract_text_locally(self, image_path: str) -> OCRResult:
+        """
+        Extract text from a single image with the local OCR engine.
+        
+        Args:
+            image_path: Path to the image file
+            
+        Returns:
+            OCR result (with ``error`` set if extraction failed)
+        """
+        image_name = os.path.basename(image_path)
+        logger.info("Processing: %s", image_name)
+        
+        try:
+            extracted_text = _run_local_ocr(image_path, self.local_language).strip()
+            logger.info("Extracted %s characters from %s", len(extracted_text), image_name)
+            return OCRResult(extracted_text)
+            
+        except Exception as e:
+            logger.error("Error processing %s: %s", image_path, e)
+            return OCRResult(error=OCRError.from_exception(e))
+    
+    async def _extract_text_locally_async(self, image_path: str) -> OCRResult:
+        """
+        Extract text from a single image with the local OCR engine in a worker process.
+        
+        Args:
+            image_path: Path to the image file
+            
+        Returns:
+            OCR result (with ``error`` set if extraction failed)
+        """
+        image_name = os.path.basename(image_path)
+        logger.info("Processing: %s", image_name)
+        
+        try:
+            loop = asyncio.get_running_loop()
+            extracted_text = await loop.run_in_executor(
+                self._get_executor(), _run_local_ocr, image_path, self.local_language
+            )
+            extracted_text = extracted_text.strip()
+            logger.info("Extracted %s characters from %s", len(extracted_text), image_name)
+            return OCRResult(extracted_text)
             
         except Exception as e:
-            print(f"Error processing {image_path} after {self.config.max_retries} retries: {str(e)}")
-            return f"[Error processing {os.path.basename(image_path)}]"
+            logger.error("Error processing %s: %s", image_path, e)
+            return OCRResult(error=OCRError.from_exception(e))
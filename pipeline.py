@@ -3,17 +3,28 @@
 Main pipeline orchestration for Book OCR to TTS processing.
 """
 
+import asyncio
+import logging
 import os
 import time
-from typing import List, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 
+from client_factory import ClientFactory
 from config import PipelineConfig
-from ocr_service import OCRService
+from result_cache import OCRCache, create_cache_backend
+from ocr_service import OCRService, PROMPT_VERSION
 from tts_service import TTSService
 from text_processor import TextProcessor
 from translation_service import TranslationService
 from progress_tracker import ProgressTracker, ProcessingStats
+from rate_limiter import TokenBucketRateLimiter
 from file_manager import FileManager
+from text_chunker import rechunk_stream
+
+logger = logging.getLogger(__name__)
+
+# Pages waiting for the first stage after OCR in streaming mode
+PAGE_QUEUE_SIZE = 16
 
 
 class BookOCRTTSPipeline:
@@ -27,43 +38,88 @@ class BookOCRTTSPipeline:
             config: Pipeline configuration
         """
         self.config = config
+        # One connection pool for OCR, cleaning and translation requests
+        self.client_factory = ClientFactory(
+            config.ocr.github_token_path, config.ocr.max_concurrency * 2
+        )
+        # Requests to the OCR endpoint share one rate limit, whichever step sends them
+        self.limiter = TokenBucketRateLimiter(config.ocr.request_rate)
         self._ocr_service = None
         self._text_processor = None
         self._translation_service = None
         self.tts_service = TTSService(config.tts)
-        self.progress_tracker = ProgressTracker(config.processing.progress_file)
+        self.progress_tracker = ProgressTracker(
+            config.processing.progress_file, indent=config.processing.pretty_progress
+        )
+        # OCR session of the current book, the progress data holding it, and the
+        # book's source language, detected at most once
+        self._session_id: Optional[str] = None
+        self._progress_data: Dict[str, Any] = {}
+        self._detected_language: Optional[str] = None
+        self._language_lock = asyncio.Lock()
+        # Content hashes of images keyed by (path, size, mtime), so unchanged files aren't re-read
+        self._hash_cache: Dict[Tuple[str, int, int], str] = {}
+        self.cache_backend = (
+            create_cache_backend(config.ocr.cache_dir) if config.ocr.cache_dir else None
+        )
+        self.ocr_cache = (
+            OCRCache(
+                self.cache_backend, config.ocr.model_name, PROMPT_VERSION,
+                FileManager.FILE_HASH_ALGORITHM
+            )
+            if self.cache_backend is not None else None
+        )
     
     @property
     def ocr_service(self):
         """Lazy initialization of OCR service."""
         if self._ocr_service is None:
-            self._ocr_service = OCRService(self.config.ocr)
+            self._ocr_service = OCRService(self.config.ocr, self.client_factory, self.limiter)
         return self._ocr_service
     
     @property
     def text_processor(self):
         """Lazy initialization of text processor."""
         if self._text_processor is None:
-            self._text_processor = TextProcessor(self.ocr_service.client, self.config.ocr)
+            self._text_processor = TextProcessor(
+                self.config.ocr, self.client_factory, self.limiter, self.cache_backend
+            )
         return self._text_processor
     
     @property
     def translation_service(self):
         """Lazy initialization of translation service."""
         if self._translation_service is None:
-            # Ensure OCR service is initialized to get the client
-            if self.ocr_service.client is None:
-                raise RuntimeError("OCR service client not initialized. Cannot create translation service.")
-            self._translation_service = TranslationService(self.ocr_service.client, self.config.ocr)
+            # A separate translation endpoint isn't bound by the OCR endpoint's rate limit
+            translation_endpoint = self.config.translation.endpoint or self.config.ocr.endpoint
+            limiter = self.limiter if translation_endpoint == self.config.ocr.endpoint else None
+            self._translation_service = TranslationService(
+                self.config.ocr, self.config.translation, self.cache_backend,
+                self.client_factory, limiter
+            )
         return self._translation_service
     
-    def process_images_to_text(self, input_dir: str, resume: bool = True) -> str:
+    async def process_images_to_text(
+        self, 
+        input_dir: str, 
+        resume: bool = True, 
+        raw_text_path: Optional[str] = None,
+        page_queue: Optional[asyncio.Queue] = None
+    ) -> str:
         """
         Process all images in directory and combine extracted text with resume capability.
         
+        Images are OCRed concurrently (bounded by ``config.ocr.max_concurrency``) while
+        request dispatches stay at least ``config.ocr.delay_seconds`` apart. Progress is
+        saved as each image finishes.
+        
         Args:
             input_dir: Directory containing images
             resume: Whether to resume from previous progress
+            raw_text_path: Optional file that receives the extracted text incrementally,
+                in image order, as soon as all preceding images are finished
+            page_queue: Optional queue that receives the page texts in the same way,
+                followed by None once all images are processed
             
         Returns:
             Combined extracted text
@@ -73,152 +129,343 @@ class BookOCRTTSPipeline:
         """
         # Get image files
         image_files = FileManager.get_image_files(input_dir)
+        total_files = len(image_files)
         
         # Load existing progress if resuming
         progress_data = self.progress_tracker.load_progress() if resume else {}
         
         # Create session ID
-        session_id = self.progress_tracker.create_session_id(
-            input_dir, self.config.ocr.model_name, len(image_files)
+        session_id = self.progress_tracker.migrate_session_id(
+            progress_data, input_dir, self.config.ocr.model_name, total_files
         )
+        self._session_id = session_id
+        self._progress_data = progress_data
         
         # Initialize or load session data
+        start_fresh = True
         if session_id in progress_data and resume:
-            print(f"📁 Resuming previous session {session_id}...")
+            logger.info("📁 Resuming previous session %s...", session_id)
             session_data = progress_data[session_id]
             processed_files = session_data.get('processed_files', {})
-            combined_texts = session_data.get('texts', [])
+            failed_files = session_data.get('failed_files', {})
+            combined_texts = self.progress_tracker.get_session_texts(session_data)
+            stat_index = session_data.get('stat_index', {})
             
-            # Calculate current stats
-            completed_count = len([f for f in processed_files.values() if f.get('success', True)])
-            failed_count = len([f for f in processed_files.values() if not f.get('success', True)])
+            # Counters are saved along with the files they count
+            saved_stats = session_data.get('stats', {})
+            completed_count = saved_stats.get('completed', 0)
+            failed_count = saved_stats.get('failed', 0)
             
-            print(f"📊 Found {completed_count} successful, {failed_count} failed from {len(image_files)} total images")
+            logger.info(
+                "📊 Found %s successful, %s failed from %s total images",
+                completed_count, failed_count, total_files
+            )
             
-            # Validate session parameters
+            # Validate session parameters (texts are stored per image position)
             if (session_data.get('input_dir') != input_dir or 
                 session_data.get('model_name') != self.config.ocr.model_name or
-                session_data.get('total_files') != len(image_files)):
-                print("⚠️  Session parameters don't match. Starting fresh session...")
-                processed_files = {}
-                combined_texts = []
-                completed_count = 0
-                failed_count = 0
+                session_data.get('total_files') != total_files or
+                len(combined_texts) != total_files):
+                logger.warning("⚠️  Session parameters don't match. Starting fresh session...")
+            elif not self.progress_tracker.is_session_compatible(
+                session_data, FileManager.FILE_HASH_ALGORITHM
+            ):
+                logger.warning("⚠️  Session was saved by an older version. Starting fresh session...")
+            else:
+                start_fresh = False
         else:
-            print(f"🆕 Starting new session {session_id}...")
+            logger.info("🆕 Starting new session %s...", session_id)
+        
+        if start_fresh:
             processed_files = {}
-            combined_texts = []
+            failed_files = {}
+            combined_texts = [None] * total_files
+            stat_index = {}
             completed_count = 0
             failed_count = 0
             
             # Initialize new session
             progress_data[session_id] = self.progress_tracker.initialize_session(
-                session_id, input_dir, self.config.ocr.model_name, len(image_files)
+                session_id, input_dir, self.config.ocr.model_name, total_files,
+                FileManager.FILE_HASH_ALGORITHM
             )
+        progress_data[session_id]['stat_index'] = stat_index
+        if start_fresh:
+            # Logged results are only replayed onto sessions in the progress file
+            self.progress_tracker.update_session_progress(
+                progress_data, session_id, processed_files, failed_files, combined_texts,
+                ProcessingStats(total=total_files)
+            )
+            self.progress_tracker.save_progress(progress_data)
         
         # Process images
         start_time = time.time()
-        stats = ProcessingStats(completed=completed_count, failed=failed_count, total=len(image_files))
+        stats = ProcessingStats(completed=completed_count, failed=failed_count, total=total_files)
+        semaphore = asyncio.Semaphore(self.config.ocr.max_concurrency)
+        # One image more than can be in flight is read and encoded ahead of time
+        prep_semaphore = asyncio.Semaphore(self.config.ocr.max_concurrency + 1)
+        
+        file_hashes: List[Optional[str]] = [None] * total_files
+        
+        async def _process_image(index: int, image_path: str) -> Tuple[int, bool]:
+            image_name = os.path.basename(image_path)
+            # Check if already processed (hashing reads the whole image, so keep it off the loop)
+            file_hash, stat_key = self._get_cached_file_hash(image_path, stat_index)
+            if file_hash is None:
+                file_hash = await asyncio.to_thread(FileManager.create_file_hash, image_path)
+            self._hash_cache[stat_key] = file_hash
+            stat_index[image_path] = [stat_key[1], stat_key[2], file_hash]
+            file_hashes[index] = file_hash
+            
+            if file_hash in processed_files:
+                logger.info("[%s/%s] ✅ Skipping %s (already processed)", index+1, total_files, image_name)
+                return index, False
+            
+            # Reuse the result of an earlier run over the same image
+            cached_text = self.ocr_cache.get(file_hash) if self.ocr_cache else None
+            if cached_text:
+                logger.info("[%s/%s] 💾 Using cached OCR result for %s", index+1, total_files, image_name)
+                self._record_ocr_success(
+                    index, file_hash, cached_text, processed_files, failed_files, combined_texts, stats
+                )
+                return index, True
+            
+            async with prep_semaphore:
+                # Encode the image while it waits for a free request slot
+                prepared = (
+                    None if self.ocr_service.is_local
+                    else asyncio.ensure_future(self.ocr_service.prepare_messages_async(image_path))
+                )
+                async with semaphore:
+                    # Show progress
+                    self._show_processing_progress(index, total_files, stats, start_time)
+                    
+                    # Process image
+                    await self._process_single_image(
+                        index, image_path, file_hash, processed_files, failed_files, combined_texts,
+                        stats, prepared
+                    )
+            return index, True
+        
+        # Runs at most once, and only if the connection check is enabled
+        await asyncio.to_thread(self.ocr_service.validate_connection)
+        
+        tasks = [
+            asyncio.ensure_future(_process_image(i, image_path))
+            for i, image_path in enumerate(image_files)
+        ]
+        finished = [False] * total_files
+        next_to_write = 0
+        unsaved_count = 0
+        save_every = self.config.processing.save_every
+        raw_text_file = open(raw_text_path, 'w', encoding='utf-8') if raw_text_path else None
         
         try:
-            for i, image_path in enumerate(image_files):
-                # Check if already processed
-                file_hash = FileManager.create_file_hash(image_path)
-                if file_hash in processed_files and processed_files[file_hash].get('success', False):
-                    print(f"[{i+1}/{len(image_files)}] ✅ Skipping {os.path.basename(image_path)} (already processed)")
-                    continue
+            # A single coordinator persists results as they arrive, so no locking is needed
+            for next_finished in asyncio.as_completed(tasks):
+                index, is_new_result = await next_finished
+                finished[index] = True
                 
-                # Show progress
-                self._show_processing_progress(i, len(image_files), stats, start_time)
-                
-                # Process image
-                self._process_single_image(image_path, file_hash, processed_files, combined_texts, stats)
-                
-                # Update progress
-                self.progress_tracker.update_session_progress(
-                    progress_data, session_id, processed_files, combined_texts, stats
-                )
-                self.progress_tracker.save_progress(progress_data)
+                # Log the result (written to disk every few images, the rest is flushed on exit)
+                if is_new_result:
+                    self._log_ocr_result(
+                        session_id, index, image_files[index], file_hashes[index],
+                        processed_files, failed_files, combined_texts
+                    )
+                unsaved_count += 1
+                if unsaved_count >= save_every:
+                    self.progress_tracker.flush_events()
+                    unsaved_count = 0
+                    # Rewriting the whole progress file is rate-limited, the log keeps every result
+                    if self.progress_tracker.should_compact():
+                        self.progress_tracker.update_session_progress(
+                            progress_data, session_id, processed_files, failed_files,
+                            combined_texts, stats
+                        )
+                        self.progress_tracker.maybe_save(progress_data)
                 
-                # Add delay between API calls (skip for last image)
-                if i < len(image_files) - 1:
-                    time.sleep(self.config.ocr.delay_seconds)
+                # Hand on every page whose predecessors are all finished
+                while next_to_write < total_files and finished[next_to_write]:
+                    page_text = combined_texts[next_to_write] or ""
+                    if raw_text_file:
+                        raw_text_file.write(page_text)
+                    if page_queue is not None:
+                        await page_queue.put(page_text)
+                    next_to_write += 1
+                if raw_text_file:
+                    raw_text_file.flush()
             
-            # Complete processing
-            full_text = "".join(combined_texts)
+            if page_queue is not None:
+                await page_queue.put(None)
+            
+            # Complete processing (texts are indexed by image position, so order is preserved)
+            full_text = "".join(text for text in combined_texts if text)
             total_time = time.time() - start_time
             
-            print("\n🎉 Processing completed!")
-            print(f"📊 Results: {stats.completed} successful, {stats.failed} failed out of {stats.total} total")
-            print(f"📝 Combined text contains {len(full_text):,} characters")
-            print(f"⏱️  Total time: {total_time/60:.1f} minutes")
+            logger.info("\n🎉 Processing completed!")
+            logger.info(
+                "📊 Results: %s successful, %s failed out of %s total",
+                stats.completed, stats.failed, stats.total
+            )
+            logger.info("📝 Combined text contains %s characters", f"{len(full_text):,}")
+            logger.info("⏱️  Total time: %s minutes", f"{total_time/60:.1f}")
             
             if stats.failed > 0:
-                print(f"⚠️  {stats.failed} files failed processing. Check the progress file for details.")
+                logger.warning(
+                    "⚠️  %s files failed processing. Check the progress file for details.",
+                    stats.failed
+                )
             
             # Mark session as completed
+            self.progress_tracker.update_session_progress(
+                progress_data, session_id, processed_files, failed_files, combined_texts, stats
+            )
             self.progress_tracker.complete_session(progress_data, session_id, full_text, stats, total_time)
             self.progress_tracker.save_progress(progress_data)
             
             return full_text
             
-        except KeyboardInterrupt:
-            print("\n\n⚠️ Processing interrupted by user")
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            logger.warning("\n\n⚠️ Processing interrupted by user")
+            self.progress_tracker.update_session_progress(
+                progress_data, session_id, processed_files, failed_files, combined_texts, stats
+            )
             self.progress_tracker.interrupt_session(progress_data, session_id, stats)
             self.progress_tracker.save_progress(progress_data)
-            print(f"💾 Progress saved. Processed {stats.completed}/{stats.total} images successfully.")
-            print("🔄 You can resume later with the same parameters.")
+            logger.info("💾 Progress saved. Processed %s/%s images successfully.", stats.completed, stats.total)
+            logger.info("🔄 You can resume later with the same parameters.")
             raise
         except Exception as e:
-            print(f"\n❌ Error during processing: {str(e)}")
+            logger.error("\n❌ Error during processing: %s", e)
+            self.progress_tracker.update_session_progress(
+                progress_data, session_id, processed_files, failed_files, combined_texts, stats
+            )
             self.progress_tracker.error_session(progress_data, session_id, str(e), stats)
             self.progress_tracker.save_progress(progress_data)
             raise
+        finally:
+            for task in tasks:
+                task.cancel()
+            if raw_text_file:
+                raw_text_file.close()
+            self.progress_tracker.close()
+            self.ocr_service.close()
+    
+    def _get_cached_file_hash(
+        self, 
+        image_path: str, 
+        stat_index: Dict[str, list]
+    ) -> Tuple[Optional[str], Tuple[str, int, int]]:
+        """
+        Look up the content hash of an image whose size and mtime haven't changed.
+        
+        Args:
+            image_path: Path to the image file
+            stat_index: Session's saved mapping of path to [size, mtime_ns, hash]
+            
+        Returns:
+            Tuple of (cached hash or None, stat key of the file)
+        """
+        st = os.stat(image_path)
+        stat_key = (image_path, st.st_size, st.st_mtime_ns)
+        
+        file_hash = self._hash_cache.get(stat_key)
+        if file_hash is None:
+            entry = stat_index.get(image_path)
+            if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+                file_hash = entry[2]
+        return file_hash, stat_key
     
-    def _process_single_image(
+    def _log_ocr_result(
         self, 
+        session_id: str, 
+        index: int, 
+        image_path: str, 
+        file_hash: str, 
+        processed_files: Dict[str, int], 
+        failed_files: Dict[str, dict], 
+        combined_texts: List[Optional[str]]
+    ) -> None:
+        """Append the outcome of an image to the progress event log."""
+        if combined_texts[index] is not None and file_hash in processed_files:
+            self.progress_tracker.log_event(
+                session_id, 'processed', index=index, hash=file_hash, text=combined_texts[index]
+            )
+        elif file_hash in failed_files:
+            failure = failed_files[file_hash]
+            self.progress_tracker.log_event(
+                session_id, 'failed', hash=file_hash, file_path=image_path,
+                error=failure['error'], timestamp=failure['timestamp']
+            )
+    
+    @staticmethod
+    def _record_ocr_success(
+        index: int, 
+        file_hash: str, 
+        extracted_text: str, 
+        processed_files: Dict[str, int], 
+        failed_files: Dict[str, dict], 
+        combined_texts: List[Optional[str]], 
+        stats: ProcessingStats
+    ) -> None:
+        """Record the extracted text of an image in the tracking data."""
+        combined_texts[index] = extracted_text
+        processed_files[file_hash] = len(extracted_text)
+        stats.completed += 1
+        # A previously failed image that now succeeded no longer counts as failed
+        if failed_files.pop(file_hash, None) is not None:
+            stats.failed -= 1
+    
+    @staticmethod
+    def _record_ocr_failure(
         image_path: str, 
         file_hash: str, 
-        processed_files: dict, 
-        combined_texts: List[str], 
+        error: str, 
+        failed_files: Dict[str, dict], 
         stats: ProcessingStats
+    ) -> None:
+        """Record a failed image in the tracking data."""
+        if file_hash not in failed_files:
+            stats.failed += 1
+        failed_files[file_hash] = {
+            'file_path': image_path,
+            'error': error,
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+    
+    async def _process_single_image(
+        self, 
+        index: int, 
+        image_path: str, 
+        file_hash: str, 
+        processed_files: Dict[str, int], 
+        failed_files: Dict[str, dict], 
+        combined_texts: List[Optional[str]], 
+        stats: ProcessingStats, 
+        prepared: Optional[Awaitable[list]] = None
     ) -> None:
         """Process a single image and update tracking data."""
+        image_name = os.path.basename(image_path)
         try:
-            extracted_text = self.ocr_service.extract_text_from_image(image_path)
+            messages = await prepared if prepared is not None else None
+            result = await self.ocr_service.extract_text_from_image_async(image_path, messages)
+            extracted_text = result.text
             
-            if extracted_text and not extracted_text.startswith("[Error"):
-                combined_texts.append(extracted_text)
-                processed_files[file_hash] = {
-                    'file_path': image_path,
-                    'file_name': os.path.basename(image_path),
-                    'text_length': len(extracted_text),
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
-                    'success': True
-                }
-                stats.completed += 1
-                print(f"✅ Successfully processed {os.path.basename(image_path)} ({len(extracted_text)} chars)")
+            if result.error is None and extracted_text:
+                if self.ocr_cache:
+                    self.ocr_cache.put(file_hash, extracted_text)
+                self._record_ocr_success(
+                    index, file_hash, extracted_text, processed_files, failed_files, combined_texts, stats
+                )
+                logger.info("✅ Successfully processed %s (%s chars)", image_name, len(extracted_text))
             else:
-                processed_files[file_hash] = {
-                    'file_path': image_path,
-                    'file_name': os.path.basename(image_path),
-                    'error': extracted_text if extracted_text.startswith("[Error") else "Unknown error",
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
-                    'success': False
-                }
-                stats.failed += 1
-                print(f"❌ Failed to process {os.path.basename(image_path)}")
+                error = str(result.error) if result.error else "No text extracted"
+                self._record_ocr_failure(image_path, file_hash, error, failed_files, stats)
+                logger.error("❌ Failed to process %s", image_name)
         
         except Exception as e:
-            processed_files[file_hash] = {
-                'file_path': image_path,
-                'file_name': os.path.basename(image_path),
-                'error': str(e),
-                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
-                'success': False
-            }
-            stats.failed += 1
-            print(f"❌ Exception processing {os.path.basename(image_path)}: {str(e)}")
+            self._record_ocr_failure(image_path, file_hash, str(e), failed_files, stats)
+            logger.error("❌ Exception processing %s: %s", image_name, e)
     
     def _show_processing_progress(
         self, 
@@ -237,12 +484,15 @@ class BookOCRTTSPipeline:
         else:
             eta_str = ""
         
-        print(f"\n[{current_index+1}/{total_files}] 🔄 Processing...")
-        print(f"📈 Progress: {stats.percentage:.1f}% ({stats.completed} successful, {stats.failed} failed{eta_str})")
+        logger.info("\n[%s/%s] 🔄 Processing...", current_index+1, total_files)
+        logger.info(
+            "📈 Progress: %s%% (%s successful, %s failed%s)",
+            f"{stats.percentage:.1f}", stats.completed, stats.failed, eta_str
+        )
     
-    def clean_text(self, raw_text: str) -> str:
+    async def clean_text(self, raw_text: str) -> str:
         """
-        Clean extracted text.
+        Clean extracted text, sending chunks concurrently.
         
         Args:
             raw_text: Raw extracted text
@@ -250,9 +500,11 @@ class BookOCRTTSPipeline:
         Returns:
             Cleaned text
         """
-        return self.text_processor.clean_extracted_text(raw_text)
+        return await self.text_processor.clean_extracted_text_async(
+            raw_text, self.config.processing.clean_chunk_size
+        )
     
-    def translate_text(self, text: str, source_language: str, target_language: str) -> str:
+    async def translate_text(self, text: str, source_language: str, target_language: str) -> str:
         """
         Translate text from source to target language.
         
@@ -266,17 +518,55 @@ class BookOCRTTSPipeline:
         """
         if source_language == "auto":
             # Auto-detect source language
-            detected_language = self.translation_service.detect_language(text)
-            print(f"🔍 Auto-detected source language: {detected_language}")
+            detected_language = await self._detect_source_language(text)
+            logger.info("🔍 Auto-detected source language: %s", detected_language)
             
             # Skip translation if already in target language
             if detected_language.lower() == target_language.lower():
-                print(f"✅ Text is already in {target_language}, skipping translation")
+                logger.info("✅ Text is already in %s, skipping translation", target_language)
                 return text
             
             source_language = detected_language
         
-        return self.translation_service.translate_text(text, source_language, target_language)
+        return await self.translation_service.translate_text_async(
+            text, source_language, target_language
+        )
+    
+    async def _detect_source_language(self, text: str) -> str:
+        """
+        Detect the language of the book, reusing an earlier detection when possible.
+        
+        Args:
+            text: Text of the book
+            
+        Returns:
+            Detected language name
+        """
+        # Chunks translated concurrently wait for the first detection instead of repeating it
+        async with self._language_lock:
+            session_data = self._progress_data.get(self._session_id)
+            if self._detected_language is None and session_data:
+                self._detected_language = session_data.get('detected_language')
+                if self._detected_language:
+                    logger.info("🔍 Reusing previously detected source language: %s", self._detected_language)
+            
+            if self._detected_language is not None:
+                return self._detected_language
+            
+            detected_language = await asyncio.to_thread(
+                self.translation_service.detect_language, text
+            )
+            if detected_language != "Unknown":
+                self._detected_language = detected_language
+                if session_data is not None:
+                    # Kept by the next checkpoint; logged so it also survives a crash
+                    # before one (OCR may still be running in streaming mode)
+                    session_data['detected_language'] = detected_language
+                    self.progress_tracker.log_event(
+                        self._session_id, 'language', language=detected_language
+                    )
+                    self.progress_tracker.flush_events()
+            return detected_language
     
     async def convert_to_speech(self, text: str, output_path: str) -> None:
         """
@@ -288,6 +578,136 @@ class BookOCRTTSPipeline:
         """
         await self.tts_service.text_to_speech(text, output_path)
     
+    async def process_streaming(
+        self, 
+        input_dir: str, 
+        output_audio: str, 
+        resume: bool = True, 
+        raw_text_path: Optional[str] = None, 
+        cleaned_text_path: Optional[str] = None, 
+        translated_text_path: Optional[str] = None
+    ) -> str:
+        """
+        Run OCR, cleaning, translation and TTS as overlapping stages.
+        
+        Stages are connected by bounded queues: each stage starts on the first
+        pages as soon as they are available, and a slow stage holds back the ones
+        before it instead of letting unprocessed text pile up. Skipped steps are
+        left out of the chain.
+        
+        Args:
+            input_dir: Directory containing images
+            output_audio: Output audio file path
+            resume: Whether to resume from previous OCR progress
+            raw_text_path: Optional file that receives the raw OCR text
+            cleaned_text_path: Optional file that receives the cleaned text
+            translated_text_path: Optional file that receives the translated text
+            
+        Returns:
+            Final text (cleaned and/or translated, as configured)
+        """
+        chunk_size = self.config.processing.clean_chunk_size
+        # Chunks being transformed at once are bounded like any other requests
+        stage_queue_size = self.config.ocr.max_concurrency
+        page_queue = asyncio.Queue(maxsize=PAGE_QUEUE_SIZE)
+        
+        stages = [self.process_images_to_text(input_dir, resume, raw_text_path, page_queue)]
+        texts = self._iter_queue(page_queue)
+        
+        if not self.config.processing.skip_cleaning:
+            cleaned_queue = asyncio.Queue(maxsize=stage_queue_size)
+            stages.append(self._run_stage(texts, self.clean_text, cleaned_queue, chunk_size))
+            texts = self._iter_stage_results(cleaned_queue, cleaned_text_path)
+        
+        if not self.config.translation.skip_translation:
+            source_language = self.config.translation.source_language
+            target_language = self.config.translation.target_language
+            
+            async def _translate(text: str) -> str:
+                return await self.translate_text(text, source_language, target_language)
+            
+            translated_queue = asyncio.Queue(maxsize=stage_queue_size)
+            stages.append(self._run_stage(texts, _translate, translated_queue, chunk_size))
+            texts = self._iter_stage_results(translated_queue, translated_text_path)
+        
+        final_texts: List[str] = []
+        stages.append(
+            self.tts_service.text_stream_to_speech(self._collect(texts, final_texts), output_audio)
+        )
+        
+        tasks = [asyncio.ensure_future(stage) for stage in stages]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # A failed stage stops the others instead of leaving them blocked on their queues
+            for task in tasks:
+                task.cancel()
+        
+        return "".join(final_texts)
+    
+    @staticmethod
+    async def _iter_queue(queue: asyncio.Queue) -> AsyncIterator[str]:
+        """Yield the items of a queue until the None that closes it."""
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            yield item
+    
+    @staticmethod
+    async def _run_stage(
+        texts: AsyncIterator[str], 
+        transform: Callable[[str], Awaitable[str]], 
+        queue: asyncio.Queue, 
+        chunk_size: int
+    ) -> None:
+        """
+        Start transforming text chunks as they arrive, queueing the pending results in order.
+        
+        Args:
+            texts: Input text pieces
+            transform: Coroutine function applied to each chunk
+            queue: Queue that receives one task per chunk, then None
+            chunk_size: Maximum number of characters per chunk
+        """
+        async for chunk in rechunk_stream(texts, chunk_size):
+            await queue.put(asyncio.ensure_future(transform(chunk)))
+        await queue.put(None)
+    
+    @staticmethod
+    async def _iter_stage_results(
+        queue: asyncio.Queue, 
+        output_path: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield the results of a stage in order, optionally appending them to a file.
+        
+        Args:
+            queue: Queue of pending transform tasks, closed by None
+            output_path: Optional file that receives the results as they are yielded
+        """
+        output_file = open(output_path, 'w', encoding='utf-8') if output_path else None
+        try:
+            while True:
+                task = await queue.get()
+                if task is None:
+                    return
+                text = await task
+                if output_file:
+                    output_file.write(text)
+                    output_file.flush()
+                yield text
+        finally:
+            if output_file:
+                output_file.close()
+    
+    @staticmethod
+    async def _collect(texts: AsyncIterator[str], collected: List[str]) -> AsyncIterator[str]:
+        """Pass text pieces through while keeping a copy of each."""
+        async for text in texts:
+            collected.append(text)
+            yield text
+    
     def load_previous_session_text(self, input_dir: str) -> Optional[str]:
         """
         Load text from a previous completed session.
@@ -299,6 +719,10 @@ class BookOCRTTSPipeline:
             Previously extracted text if found, None otherwise
         """
         image_files = FileManager.get_image_files(input_dir)
+        self._session_id = self.progress_tracker.create_session_id(
+            input_dir, self.config.ocr.model_name, len(image_files)
+        )
+        self._progress_data = self.progress_tracker.load_progress()
         return self.progress_tracker.get_completed_session_text(
             input_dir, self.config.ocr.model_name, len(image_files)
         )
@@ -7,9 +7,14 @@ import os
 import json
 import time
 import hashlib
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 @dataclass
 class ProcessingStats:
@@ -27,14 +32,44 @@ class ProcessingStats:
 class ProgressTracker:
     """Manages progress tracking and session persistence."""
     
-    def __init__(self, progress_file: str = "ocr_progress.json"):
+    # The event log is folded into the progress file once it grows this many times larger
+    COMPACTION_RATIO = 4
+    
+    # Minimum time between two saves of the progress file made by ``maybe_save`` (seconds)
+    MIN_SAVE_INTERVAL = 5.0
+    
+    # Bumped whenever the per-session data can't be reused by newer code
+    # (version 2: file hashes are no longer MD5 digests;
+    #  version 3: successes and failures are tracked separately)
+    SCHEMA_VERSION = 3
+    
+    def __init__(self, progress_file: str = "ocr_progress.json", indent: bool = False):
         """
         Initialize progress tracker.
         
         Args:
             progress_file: Path to the progress tracking file
+            indent: Write the progress file indented for reading; compact output
+                is several times faster to save on large sessions
         """
         self.progress_file = progress_file
+        self.indent = indent
+        # Encoders for when orjson isn't installed, built once instead of on every call
+        # (the data is plain dicts and lists, so the circular reference check can go)
+        self._encode_progress = json.JSONEncoder(
+            indent=2 if indent else None, check_circular=False, ensure_ascii=False
+        ).encode
+        self._encode_event = json.JSONEncoder(check_circular=False, ensure_ascii=False).encode
+        # Per-image results are appended here between full saves of the progress file
+        self.event_log_path = f"{progress_file}.log"
+        # The full text of each completed session is kept out of the progress file,
+        # in a directory named after it (so progress files don't share one)
+        self.sessions_dir = f"{os.path.splitext(progress_file)[0]}.sessions"
+        self._event_log = None
+        self._last_save: Optional[float] = None
+        # Data returned by the last load_progress, and the file signatures it was read at
+        self._cache: Optional[Dict[str, Any]] = None
+        self._cache_key = None
     
     def create_session_id(self, input_dir: str, model_name: str, total_files: int) -> str:
         """
@@ -49,42 +84,261 @@ class ProgressTracker:
             8-character session ID
         """
         session_data = f"{input_dir}_{model_name}_{total_files}"
-        return hashlib.md5(session_data.encode()).hexdigest()[:8]
+        return hashlib.blake2b(session_data.encode(), digest_size=4).hexdigest()
+    
+    @staticmethod
+    def _legacy_session_id(input_dir: str, model_name: str, total_files: int) -> Optional[str]:
+        """Get the MD5-based session ID used by older versions, if MD5 is available."""
+        session_data = f"{input_dir}_{model_name}_{total_files}"
+        try:
+            return hashlib.md5(session_data.encode()).hexdigest()[:8]
+        except ValueError:
+            # MD5 is disabled on FIPS-enabled systems
+            return None
+    
+    def migrate_session_id(
+        self, 
+        progress_data: Dict[str, Any], 
+        input_dir: str, 
+        model_name: str, 
+        total_files: int
+    ) -> str:
+        """
+        Get the session ID for the parameters, moving a session saved under its
+        older MD5-based ID to the current one.
+        
+        Args:
+            progress_data: Main progress data dictionary
+            input_dir: Input directory path
+            model_name: Model name used for processing
+            total_files: Total number of files to process
+            
+        Returns:
+            Session ID
+        """
+        session_id = self.create_session_id(input_dir, model_name, total_files)
+        if session_id not in progress_data:
+            legacy_session_id = self._legacy_session_id(input_dir, model_name, total_files)
+            if legacy_session_id in progress_data:
+                progress_data[session_id] = progress_data.pop(legacy_session_id)
+        return session_id
     
     def save_progress(self, progress_data: Dict[str, Any]) -> None:
         """
         Save processing progress to file.
         
+        The data is written and synced to a temporary file that then replaces the
+        progress file, so a crash (or power loss) mid-write never leaves a
+        truncated progress file behind. Call it once per checkpoint, not per image.
+        
         Args:
             progress_data: Progress data to save
         """
+        self._cache = None
+        tmp_path = f"{self.progress_file}.tmp"
         try:
-            with open(self.progress_file, 'w') as f:
-                json.dump(progress_data, f, indent=2)
+            if orjson is not None:
+                data = orjson.dumps(progress_data, option=orjson.OPT_INDENT_2 if self.indent else 0)
+            else:
+                # One write of the whole document; json.dump writes every token separately
+                data = self._encode_progress(progress_data).encode('utf-8')
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                # Make sure the new contents are on disk before they replace the old ones
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.progress_file)
         except Exception as e:
             print(f"Warning: Could not save progress: {e}")
+            return
+        
+        self._last_save = time.monotonic()
+        # Everything in the event log is now part of the progress file
+        self._truncate_event_log()
+    
+    def maybe_save(self, progress_data: Dict[str, Any], min_interval: Optional[float] = None) -> bool:
+        """
+        Save progress unless the progress file was saved only a moment ago.
+        
+        Meant for periodic checkpoints while processing; session state changes
+        (completion, interruption, errors) should call ``save_progress`` directly.
+        
+        Args:
+            progress_data: Progress data to save
+            min_interval: Minimum time since the last save, in seconds
+                (defaults to ``MIN_SAVE_INTERVAL``)
+            
+        Returns:
+            True if the progress was saved
+        """
+        if min_interval is None:
+            min_interval = self.MIN_SAVE_INTERVAL
+        if self._last_save is not None and time.monotonic() - self._last_save < min_interval:
+            return False
+        self.save_progress(progress_data)
+        return True
+    
+    def log_event(self, session_id: str, event: str, **fields: Any) -> None:
+        """
+        Append a single result to the event log.
+        
+        Unlike ``save_progress`` this costs the same for every image, however
+        many results the session already holds. Events reach the disk on
+        ``flush_events`` (or when the buffer fills up).
+        
+        Args:
+            session_id: Session identifier
+            event: Event kind ('processed', 'failed' or 'language')
+            **fields: Event details
+        """
+        if self._event_log is None:
+            self._event_log = open(self.event_log_path, 'ab')
+        record = {'session': session_id, 'event': event, **fields}
+        if orjson is not None:
+            line = orjson.dumps(record)
+        else:
+            line = self._encode_event(record).encode('utf-8')
+        self._event_log.write(line + b'\n')
+    
+    def flush_events(self) -> None:
+        """Write buffered events to disk."""
+        if self._event_log is not None:
+            self._event_log.flush()
+    
+    def should_compact(self) -> bool:
+        """Check whether the event log has outgrown the progress file it extends."""
+        if self._event_log is None:
+            return False
+        try:
+            snapshot_size = os.path.getsize(self.progress_file)
+        except OSError:
+            snapshot_size = 0
+        return self._event_log.tell() > self.COMPACTION_RATIO * max(snapshot_size, 1)
+    
+    def close(self) -> None:
+        """Flush and close the event log."""
+        if self._event_log is not None:
+            self._event_log.close()
+            self._event_log = None
+    
+    def _truncate_event_log(self) -> None:
+        """Empty the event log after its events were saved to the progress file."""
+        try:
+            if self._event_log is not None:
+                self._event_log.flush()
+                self._event_log.truncate(0)
+                # Append mode writes at the end anyway, but tell() (see should_compact)
+                # keeps reporting the old size until the position is reset
+                self._event_log.seek(0)
+            elif os.path.exists(self.event_log_path):
+                os.remove(self.event_log_path)
+        except OSError as e:
+            print(f"Warning: Could not truncate progress event log: {e}")
+    
+    def _replay_events(self, progress_data: Dict[str, Any]) -> None:
+        """
+        Apply the events logged since the last full save to the progress data.
+        
+        Replaying is idempotent, so events that also made it into the progress
+        file (e.g. after a crash between the save and the truncation) are harmless.
+        
+        Args:
+            progress_data: Progress data loaded from the progress file
+        """
+        if not os.path.exists(self.event_log_path):
+            return
+        
+        loads = orjson.loads if orjson is not None else json.loads
+        with open(self.event_log_path, 'rb') as f:
+            for line in f:
+                try:
+                    record = loads(line)
+                except ValueError:
+                    # A line cut short by a crash
+                    continue
+                
+                session_data = progress_data.get(record.get('session'))
+                if session_data is None:
+                    continue
+                if record['event'] == 'language':
+                    session_data['detected_language'] = record['language']
+                    continue
+                processed_files = session_data.setdefault('processed_files', {})
+                failed_files = session_data.setdefault('failed_files', {})
+                stats = session_data.setdefault('stats', {'completed': 0, 'failed': 0})
+                file_hash = record['hash']
+                
+                if record['event'] == 'processed':
+                    texts = self.get_session_texts(session_data)
+                    if 0 <= record['index'] < len(texts):
+                        texts[record['index']] = record['text']
+                    if file_hash not in processed_files:
+                        processed_files[file_hash] = len(record['text'])
+                        stats['completed'] = stats.get('completed', 0) + 1
+                    if failed_files.pop(file_hash, None) is not None:
+                        stats['failed'] = stats.get('failed', 0) - 1
+                elif record['event'] == 'failed':
+                    if file_hash not in failed_files:
+                        stats['failed'] = stats.get('failed', 0) + 1
+                    failed_files[file_hash] = {
+                        'file_path': record['file_path'],
+                        'error': record['error'],
+                        'timestamp': record['timestamp']
+                    }
+                
+                total = session_data.get('total_files', 0)
+                stats['total'] = total
+                stats['percentage'] = (stats['completed'] / total * 100) if total > 0 else 0.0
     
     def load_progress(self) -> Dict[str, Any]:
         """
         Load processing progress from file.
         
+        Results logged since the file was last saved are replayed on top of it.
+        The result is kept in memory and returned again (the same dictionary)
+        until the progress file or its event log changes.
+        
         Returns:
             Progress data dictionary, empty if file doesn't exist or can't be loaded
         """
+        self.flush_events()
+        cache_key = (self._file_signature(self.progress_file),
+                     self._file_signature(self.event_log_path))
+        if self._cache is not None and cache_key == self._cache_key:
+            return self._cache
+        
+        progress_data = {}
         try:
             if os.path.exists(self.progress_file):
-                with open(self.progress_file, 'r') as f:
-                    return json.load(f)
+                # One read of the whole file; json.load reads it in small pieces
+                with open(self.progress_file, 'rb') as f:
+                    data = f.read()
+                progress_data = orjson.loads(data) if orjson is not None else json.loads(data)
+            self._replay_events(progress_data)
         except Exception as e:
             print(f"Warning: Could not load progress: {e}")
-        return {}
+            return progress_data
+        
+        self._cache = progress_data
+        self._cache_key = cache_key
+        return progress_data
+    
+    @staticmethod
+    def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+        """Get the modification time and size of a file, or None if it doesn't exist."""
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return None
+        return stat_result.st_mtime_ns, stat_result.st_size
     
     def initialize_session(
         self, 
         session_id: str, 
         input_dir: str, 
         model_name: str, 
-        total_files: int
+        total_files: int,
+        file_hash_algorithm: str
     ) -> Dict[str, Any]:
         """
         Initialize a new processing session.
@@ -94,25 +348,45 @@ class ProgressTracker:
             input_dir: Input directory path
             model_name: Model name for processing
             total_files: Total number of files to process
+            file_hash_algorithm: Algorithm used for the processed file hashes
             
         Returns:
             Initial session data dictionary
         """
         return {
+            'schema_version': self.SCHEMA_VERSION,
+            'file_hash_algorithm': file_hash_algorithm,
             'input_dir': input_dir,
             'model_name': model_name,
             'total_files': total_files,
             'processed_files': {},
+            'failed_files': {},
             'texts': [],
             'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'created_at': time.time(),
             'status': 'running'
         }
     
+    def is_session_compatible(self, session_data: Dict[str, Any], file_hash_algorithm: str) -> bool:
+        """
+        Check whether a saved session's processed file hashes can be reused.
+        
+        Args:
+            session_data: Saved session data
+            file_hash_algorithm: Algorithm currently used for file hashes
+            
+        Returns:
+            True if the session was written with the current schema and hash algorithm
+        """
+        return (session_data.get('schema_version') == self.SCHEMA_VERSION and
+                session_data.get('file_hash_algorithm') == file_hash_algorithm)
+    
     def update_session_progress(
         self, 
         progress_data: Dict[str, Any], 
         session_id: str, 
-        processed_files: Dict[str, Any], 
+        processed_files: Dict[str, int], 
+        failed_files: Dict[str, Any], 
         texts: List[str], 
         stats: ProcessingStats
     ) -> None:
@@ -122,11 +396,13 @@ class ProgressTracker:
         Args:
             progress_data: Main progress data dictionary
             session_id: Session identifier
-            processed_files: Dictionary of processed file information
+            processed_files: Text length of each successfully processed file, by file hash
+            failed_files: Error details of each failed file, by file hash
             texts: List of extracted texts
             stats: Processing statistics
         """
         progress_data[session_id]['processed_files'] = processed_files
+        progress_data[session_id]['failed_files'] = failed_files
         progress_data[session_id]['texts'] = texts
         progress_data[session_id]['last_updated'] = time.strftime('%Y-%m-%d %H:%M:%S')
         progress_data[session_id]['stats'] = {
@@ -147,6 +423,11 @@ class ProgressTracker:
         """
         Mark a session as completed and save final results.
         
+        The extracted text goes to ``<progress file name>.sessions/<session_id>.txt``,
+        so later saves don't rewrite it each time. The per-image texts are replaced
+        by their lengths, which is enough to split that file up again on resume
+        (see ``get_session_texts``).
+        
         Args:
             progress_data: Main progress data dictionary
             session_id: Session identifier
@@ -156,7 +437,22 @@ class ProgressTracker:
         """
         progress_data[session_id]['status'] = 'completed'
         progress_data[session_id]['completion_time'] = time.strftime('%Y-%m-%d %H:%M:%S')
-        progress_data[session_id]['extracted_text'] = full_text
+        text_path = self._session_text_path(session_id)
+        try:
+            os.makedirs(self.sessions_dir, exist_ok=True)
+            tmp_path = f"{text_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(full_text)
+            os.replace(tmp_path, text_path)
+            progress_data[session_id]['extracted_text_path'] = text_path
+            progress_data[session_id].pop('extracted_text', None)
+            progress_data[session_id]['text_lengths'] = [
+                len(text) if text is not None else None
+                for text in progress_data[session_id].pop('texts', [])
+            ]
+        except OSError as e:
+            print(f"Warning: Could not save session text, keeping it in the progress file: {e}")
+            progress_data[session_id]['extracted_text'] = full_text
         progress_data[session_id]['final_stats'] = {
             'completed': stats.completed,
             'failed': stats.failed,
@@ -166,6 +462,71 @@ class ProgressTracker:
             'total_characters': len(full_text)
         }
     
+    def get_session_texts(self, session_data: Dict[str, Any]) -> List[Optional[str]]:
+        """
+        Get the text extracted from each image of a session.
+        
+        Completed sessions only keep the text lengths, so their texts are read
+        back from the session text file and put into the session data again.
+        
+        Args:
+            session_data: Saved session data
+            
+        Returns:
+            Text per image position (None for images without text), or an empty
+            list if the texts can't be recovered
+        """
+        if 'texts' in session_data:
+            return session_data['texts']
+        
+        text_lengths = session_data.get('text_lengths')
+        full_text = self._load_session_text(session_data) if text_lengths is not None else None
+        if full_text is None:
+            return []
+        if sum(length or 0 for length in text_lengths) != len(full_text):
+            print("Warning: Session text doesn't match the saved text lengths")
+            return []
+        
+        texts = []
+        offset = 0
+        for length in text_lengths:
+            if length is None:
+                texts.append(None)
+            else:
+                texts.append(full_text[offset:offset + length])
+                offset += length
+        session_data['texts'] = texts
+        del session_data['text_lengths']
+        return texts
+    
+    def _session_text_path(self, session_id: str) -> str:
+        """Get the path of the file holding a completed session's extracted text."""
+        return os.path.join(self.sessions_dir, f"{session_id}.txt")
+    
+    def _load_session_text(self, session_data: Dict[str, Any]) -> Optional[str]:
+        """
+        Get a completed session's extracted text.
+        
+        Args:
+            session_data: Saved session data
+            
+        Returns:
+            Extracted text, or None if the session has none (or its file is gone)
+        """
+        # Sessions completed by older versions keep the text inline
+        if 'extracted_text' in session_data:
+            return session_data['extracted_text']
+        
+        text_path = session_data.get('extracted_text_path')
+        if not text_path:
+            return None
+        try:
+            with open(text_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError as e:
+            print(f"Warning: Could not read session text: {e}")
+            return None
+    
     def interrupt_session(
         self, 
         progress_data: Dict[str, Any], 
@@ -257,6 +618,31 @@ class ProgressTracker:
                 print(f"  Last updated: {session_data['last_updated']}")
             print()
     
+    @staticmethod
+    def _parse_timestamp(timestamp_str: str) -> Optional[float]:
+        """
+        Convert a local 'YYYY-MM-DD HH:MM:SS' timestamp to seconds since the epoch.
+        
+        The fields are sliced out of the fixed-width string, which is much
+        cheaper than ``time.strptime``.
+        
+        Args:
+            timestamp_str: Formatted timestamp
+            
+        Returns:
+            Seconds since the epoch, or None if the timestamp is malformed
+        """
+        if not isinstance(timestamp_str, str) or len(timestamp_str) != 19:
+            return None
+        try:
+            return time.mktime((
+                int(timestamp_str[0:4]), int(timestamp_str[5:7]), int(timestamp_str[8:10]),
+                int(timestamp_str[11:13]), int(timestamp_str[14:16]), int(timestamp_str[17:19]),
+                0, 0, -1
+            ))
+        except (ValueError, OverflowError):
+            return None
+    
     def cleanup_old_sessions(self, days_old: int = 7) -> None:
         """
         Remove progress sessions older than specified days.
@@ -274,19 +660,20 @@ class ProgressTracker:
         sessions_to_remove = []
         
         for session_id, session_data in progress_data.items():
-            timestamp_str = session_data.get('timestamp', '')
-            try:
-                # Parse timestamp
-                session_time = time.mktime(time.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S'))
-                if session_time < cutoff_time:
-                    sessions_to_remove.append(session_id)
-            except (ValueError, TypeError):
-                # If we can't parse the timestamp, consider it for removal
+            session_time = session_data.get('created_at')
+            if session_time is None:
+                # Sessions saved by older versions only have the formatted timestamp
+                session_time = self._parse_timestamp(session_data.get('timestamp', ''))
+            
+            # If we can't parse the timestamp, consider it for removal
+            if session_time is None or session_time < cutoff_time:
                 sessions_to_remove.append(session_id)
         
         if sessions_to_remove:
             for session_id in sessions_to_remove:
-                del progress_data[session_id]
+                text_path = progress_data.pop(session_id).get('extracted_text_path')
+                if text_path and os.path.exists(text_path):
+                    os.remove(text_path)
             
             self.save_progress(progress_data)
             print(f"🧹 Cleaned up {len(sessions_to_remove)} old session(s)")
@@ -311,14 +698,15 @@ class ProgressTracker:
             Extracted text if found, None otherwise
         """
         progress_data = self.load_progress()
-        session_id = self.create_session_id(input_dir, model_name, total_files)
+        session_id = self.migrate_session_id(progress_data, input_dir, model_name, total_files)
         
         if session_id in progress_data:
             session_data = progress_data[session_id]
-            if (session_data.get('status') == 'completed' and 
-                'extracted_text' in session_data):
-                
-                extracted_text = session_data['extracted_text']
+            extracted_text = None
+            if session_data.get('status') == 'completed':
+                extracted_text = self._load_session_text(session_data)
+            
+            if extracted_text is not None:
                 stats = session_data.get('final_stats', {})
                 completed = stats.get('completed', 0)
                 total = stats.get('total', 0)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Rate limiting for concurrent API calls.
+"""
+
+import asyncio
+from typing import Optional
+
+
+class TokenBucketRateLimiter:
+    """Keeps the average request rate across coroutines at a target using a token bucket."""
+    
+    def __init__(self, rate: Optional[float], capacity: Optional[float] = None):
+        """
+        Initialize rate limiter.
+        
+        Args:
+            rate: Requests allowed per second (None or <= 0 disables limiting)
+            capacity: Maximum burst size (defaults to one second's worth of requests)
+        """
+        self.rate = rate if rate and rate > 0 else None
+        self.capacity = capacity if capacity is not None else max(1.0, self.rate or 1.0)
+        self._tokens = self.capacity
+        self._last_refill: Optional[float] = None
+        self._lock = asyncio.Lock()
+    
+    def _refill(self, now: float) -> None:
+        """Add the tokens accumulated since the last refill."""
+        if self._last_refill is not None:
+            elapsed = now - self._last_refill
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+    
+    async def acquire(self) -> None:
+        """Wait until a request is allowed to be dispatched."""
+        if self.rate is None:
+            return
+        
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            self._refill(loop.time())
+            # Tokens accumulate while requests are in flight, so a slow response
+            # doesn't also delay the next dispatch
+            if self._tokens < 1:
+                # Sleep only for the missing fraction of a token
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill(loop.time())
+            self._tokens -= 1
+    
+    async def __aenter__(self) -> 'TokenBucketRateLimiter':
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        return None
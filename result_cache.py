@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Persistent caches of OCR, cleaning, translation and language detection results.
+
+Results are stored in a SQLite database inside the cache directory, or in Redis
+when the ``REDIS_URL`` environment variable is set (and the ``redis`` package is
+installed), so they can be shared between machines. Keys carry a prompt version,
+so changing a prompt invalidates the results produced by the old one.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from typing import Optional
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# How long Redis keeps cached results (seconds)
+REDIS_TTL_SECONDS = 30 * 24 * 3600
+
+
+class SQLiteCacheBackend:
+    """Key-value store in a local SQLite database."""
+    
+    def __init__(self, db_path: str):
+        """
+        Initialize SQLite backend.
+        
+        Args:
+            db_path: Path to the database file (created if missing)
+        """
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at INTEGER NOT NULL)"
+            )
+    
+    def get(self, key: str) -> Optional[str]:
+        """Get the value stored for a key, if any."""
+        row = self._conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def put(self, key: str, value: str) -> None:
+        """Store a value for a key."""
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, int(time.time()))
+            )
+    
+    def delete_prefix(self, prefix: str) -> int:
+        """Delete all keys starting with a prefix and return how many were removed."""
+        with self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+            )
+        return cursor.rowcount
+
+
+class RedisCacheBackend:
+    """Key-value store in Redis, with expiring entries."""
+    
+    def __init__(self, url: str, ttl_seconds: int = REDIS_TTL_SECONDS):
+        """
+        Initialize Redis backend.
+        
+        Args:
+            url: Redis connection URL
+            ttl_seconds: Lifetime of stored entries
+        """
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        self.ttl_seconds = ttl_seconds
+    
+    def get(self, key: str) -> Optional[str]:
+        """Get the value stored for a key, if any."""
+        return self._client.get(key)
+    
+    def put(self, key: str, value: str) -> None:
+        """Store a value for a key."""
+        self._client.set(key, value, ex=self.ttl_seconds)
+    
+    def delete_prefix(self, prefix: str) -> int:
+        """Delete all keys starting with a prefix and return how many were removed."""
+        removed = 0
+        for key in self._client.scan_iter(match=f"{prefix}*"):
+            removed += self._client.delete(key)
+        return removed
+
+
+def create_cache_backend(cache_dir: str):
+    """
+    Create the cache backend: Redis if ``REDIS_URL`` is set, otherwise SQLite.
+    
+    Args:
+        cache_dir: Directory for the SQLite database
+        
+    Returns:
+        Cache backend instance
+    """
+    redis_url = os.environ.get("REDIS_URL")
+    if redis_url:
+        if redis is not None:
+            return RedisCacheBackend(redis_url)
+        logger.warning("⚠️  Warning: REDIS_URL is set but the redis package is not installed, using SQLite cache")
+    return SQLiteCacheBackend(os.path.join(cache_dir, "cache.sqlite3"))
+
+
+def _read_result(backend, key: str, description: str) -> Optional[str]:
+    """
+    Read a cached result, treating empty values and read errors as misses.
+    
+    Args:
+        backend: Cache backend
+        key: Cache key
+        description: What the result is, for the warning message
+        
+    Returns:
+        Cached result, or None if there is no usable one
+    """
+    try:
+        value = backend.get(key)
+    except Exception as e:
+        # A failed cache read only costs a re-run of the request
+        logger.warning("⚠️  Warning: Could not read cached %s: %s", description, e)
+        return None
+    return value if value and value.strip() else None
+
+
+def _write_result(backend, key: str, value: str, description: str) -> None:
+    """
+    Store a result, unless it is empty.
+    
+    Args:
+        backend: Cache backend
+        key: Cache key
+        value: Result to store
+        description: What the result is, for the warning message
+    """
+    if not value or not value.strip():
+        return
+    try:
+        backend.put(key, value)
+    except Exception as e:
+        # A failed cache write only costs a re-run of the request next time
+        logger.warning("⚠️  Warning: Could not cache %s: %s", description, e)
+
+
+class OCRCache:
+    """Stores extracted text per image content hash, OCR model and prompt version."""
+    
+    KEY_PREFIX = "ocr:"
+    
+    def __init__(self, backend, model_name: str, prompt_version: int, hash_algorithm: str):
+        """
+        Initialize OCR cache.
+        
+        Args:
+            backend: Cache backend
+            model_name: OCR model name (switching models re-runs OCR)
+            prompt_version: Version of the OCR prompt (bumping it re-runs OCR)
+            hash_algorithm: Name of the algorithm used for image hashes
+        """
+        self.backend = backend
+        self._key_prefix = f"{self.KEY_PREFIX}v{prompt_version}:{model_name}:{hash_algorithm}:"
+    
+    def get(self, file_hash: str) -> Optional[str]:
+        """
+        Look up the cached OCR result for an image.
+        
+        Args:
+            file_hash: Content hash of the image file
+            
+        Returns:
+            Cached text, or None if the image hasn't been OCRed with this model and
+            prompt (or the cache can't be read)
+        """
+        return _read_result(self.backend, self._key_prefix + file_hash, "OCR result")
+    
+    def put(self, file_hash: str, text: str) -> None:
+        """
+        Store the OCR result for an image.
+        
+        Args:
+            file_hash: Content hash of the image file
+            text: Extracted text
+        """
+        _write_result(self.backend, self._key_prefix + file_hash, text, "OCR result")
+    
+    @classmethod
+    def clear(cls, backend) -> None:
+        """Remove all cached OCR results, for every model and prompt version."""
+        removed = backend.delete_prefix(cls.KEY_PREFIX)
+        logger.info("🧹 Cleared %s cached OCR result(s)", removed)
+
+
+class TranslationCache:
+    """Stores translations per source text, language pair, model and prompt version."""
+    
+    KEY_PREFIX = "translate:"
+    
+    def __init__(self, backend, model_name: str, prompt_version: int):
+        """
+        Initialize translation cache.
+        
+        Args:
+            backend: Cache backend
+            model_name: Translation model name
+            prompt_version: Version of the translation prompt
+        """
+        self.backend = backend
+        self._key_prefix = f"{self.KEY_PREFIX}v{prompt_version}:{model_name}:"
+    
+    def _key(self, text: str, source_language: str, target_language: str) -> str:
+        """Build the cache key for a text and language pair."""
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self._key_prefix}{source_language}:{target_language}:{text_hash}"
+    
+    def get(self, text: str, source_language: str, target_language: str) -> Optional[str]:
+        """Look up the cached translation of a text, if any."""
+        return _read_result(self.backend, self._key(text, source_language, target_language), "translation")
+    
+    def put(self, text: str, source_language: str, target_language: str, translation: str) -> None:
+        """Store the translation of a text."""
+        _write_result(
+            self.backend, self._key(text, source_language, target_language), translation, "translation"
+        )
+
+
+class CleaningCache:
+    """Stores cleaned text per raw text chunk, model and prompt version."""
+    
+    KEY_PREFIX = "clean:"
+    
+    def __init__(self, backend, model_name: str, prompt_version: int):
+        """
+        Initialize cleaning cache.
+        
+        Args:
+            backend: Cache backend
+            model_name: Cleaning model name
+            prompt_version: Version of the cleaning prompt
+        """
+        self.backend = backend
+        self._key_prefix = f"{self.KEY_PREFIX}v{prompt_version}:{model_name}:"
+    
+    def _key(self, text: str) -> str:
+        """Build the cache key for a text."""
+        return self._key_prefix + hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def get(self, text: str) -> Optional[str]:
+        """Look up the cleaned version of a text, if any."""
+        return _read_result(self.backend, self._key(text), "cleaned text")
+    
+    def put(self, text: str, cleaned_text: str) -> None:
+        """Store the cleaned version of a text."""
+        _write_result(self.backend, self._key(text), cleaned_text, "cleaned text")
+
+
+class LanguageCache:
+    """Stores detected languages per text sample and model."""
+    
+    KEY_PREFIX = "lang:"
+    
+    def __init__(self, backend, model_name: str):
+        """
+        Initialize language cache.
+        
+        Args:
+            backend: Cache backend
+            model_name: Detection model name
+        """
+        self.backend = backend
+        self._key_prefix = f"{self.KEY_PREFIX}{model_name}:"
+    
+    def get(self, sample_hash: str) -> Optional[str]:
+        """Look up the language detected for a text sample, if any."""
+        return _read_result(self.backend, self._key_prefix + sample_hash, "detected language")
+    
+    def put(self, sample_hash: str, language: str) -> None:
+        """Store the language detected for a text sample."""
+        _write_result(self.backend, self._key_prefix + sample_hash, language, "detected language")
@@ -3,37 +3,193 @@
 Retry handler with exponential backoff for API calls.
 """
 
+import asyncio
+import logging
+import random
+import re
 import time
-from typing import Callable, TypeVar
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional, TypeVar
 from functools import wraps
 
+try:
+    import openai
+except ImportError:
+    openai = None
+
+logger = logging.getLogger(__name__)
+
 T = TypeVar('T')
 
 
 class RetryHandler:
     """Handles retry logic with exponential backoff."""
     
-    # Error types that shouldn't be retried
+    # SDK error classes that settle the question without looking at the message
+    if openai is not None:
+        NON_RETRYABLE_ERROR_TYPES = (
+            openai.AuthenticationError, openai.PermissionDeniedError, openai.NotFoundError,
+            openai.BadRequestError, openai.UnprocessableEntityError
+        )
+        RETRYABLE_ERROR_TYPES = (
+            openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError
+        )
+    else:
+        NON_RETRYABLE_ERROR_TYPES = RETRYABLE_ERROR_TYPES = ()
+    
+    # Error types that shouldn't be retried (for errors raised outside the SDK)
     NON_RETRYABLE_ERRORS = [
         'invalid_request_error', 'authentication_failed', 'permission_denied',
-        'quota_exceeded', 'model_not_found', 'invalid_api_key'
+        'model_not_found', 'invalid_api_key'
     ]
     
+    # Client error status codes that may succeed when repeated (timeout, conflict,
+    # throttling); any other 4xx fails the same way on every attempt, while 5xx
+    # errors are temporary
+    RETRYABLE_STATUS_CODES = frozenset({408, 409, 429})
+    
+    _THROTTLING_PATTERN = re.compile(r"rate.?limit|quota|throttl", re.IGNORECASE)
+    
+    # All non-retryable error types, matched in one pass over the message
+    _NON_RETRYABLE_PATTERN = re.compile(
+        "|".join(re.escape(error_type) for error_type in NON_RETRYABLE_ERRORS), re.IGNORECASE
+    )
+    
+    @staticmethod
+    def get_status_code(error: Exception) -> Optional[int]:
+        """Get the HTTP status code attached to an error, if any."""
+        # openai errors expose ``status_code``, aiohttp errors expose ``status``
+        for attribute in ('status_code', 'status'):
+            status = getattr(error, attribute, None)
+            if isinstance(status, int):
+                return status
+        return None
+    
+    @staticmethod
+    def get_retry_after(error: Exception) -> Optional[float]:
+        """
+        Get the server-provided ``Retry-After`` delay from an error, if any.
+        
+        Args:
+            error: Exception raised by the API call
+            
+        Returns:
+            Delay in seconds, or None if the server didn't supply one
+        """
+        response = getattr(error, 'response', None)
+        headers = getattr(response, 'headers', None) or getattr(error, 'headers', None)
+        if not headers:
+            return None
+        
+        value = headers.get('retry-after') or headers.get('Retry-After')
+        if not value:
+            return None
+        
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            pass
+        
+        # Retry-After may also be an HTTP date
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, retry_at.timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+    
     @staticmethod
     def is_retryable_error(error: Exception) -> bool:
         """Check if an error should be retried."""
-        error_message = str(error).lower()
-        return not any(
-            non_retry_error in error_message 
-            for non_retry_error in RetryHandler.NON_RETRYABLE_ERRORS
-        )
+        if isinstance(error, RetryHandler.NON_RETRYABLE_ERROR_TYPES):
+            return False
+        if isinstance(error, RetryHandler.RETRYABLE_ERROR_TYPES):
+            return True
+        
+        status_code = RetryHandler.get_status_code(error)
+        if status_code is not None and status_code >= 400:
+            return status_code >= 500 or status_code in RetryHandler.RETRYABLE_STATUS_CODES
+        
+        error_message = str(error)
+        if RetryHandler._THROTTLING_PATTERN.search(error_message):
+            return True
+        
+        return RetryHandler._NON_RETRYABLE_PATTERN.search(error_message) is None
+    
+    @staticmethod
+    def compute_backoff(
+        attempt: int,
+        error: Optional[Exception] = None,
+        delay_factor: float = 2.0,
+        min_backoff: float = 1.0,
+        max_backoff: float = 30.0
+    ) -> float:
+        """
+        Compute how long to wait before the next attempt.
+        
+        Args:
+            attempt: Zero-based index of the attempt that just failed
+            error: Exception raised by the failed attempt
+            delay_factor: Exponential backoff factor
+            min_backoff: Backoff window after the first failed attempt
+            max_backoff: Upper bound for the backoff window (and for ``Retry-After``)
+            
+        Returns:
+            Wait time in seconds
+        """
+        # The server knows best how long it wants us to back off, within reason
+        if error is not None:
+            retry_after = RetryHandler.get_retry_after(error)
+            if retry_after is not None:
+                return min(retry_after, max_backoff)
+        
+        # Full jitter: concurrent callers spread their retries over the whole
+        # backoff window instead of retrying in lockstep
+        return random.uniform(0, min(max_backoff, min_backoff * delay_factor ** attempt))
+    
+    @staticmethod
+    def _wait_before_retry(
+        attempt: int,
+        max_retries: int,
+        error: Exception,
+        is_retryable: Callable[[Exception], bool],
+        backoff: Callable[[int, Exception], float]
+    ) -> Optional[float]:
+        """
+        Decide what to do after a failed attempt.
+        
+        Args:
+            attempt: Zero-based index of the attempt that just failed
+            max_retries: Maximum number of attempts
+            error: Exception raised by the failed attempt
+            is_retryable: Returns whether an error is worth retrying
+            backoff: Returns the wait time for a failed attempt and its error
+            
+        Returns:
+            Wait time in seconds, or None if the error should be raised
+        """
+        if not is_retryable(error):
+            logger.warning("Non-retryable error: %s", error)
+            return None
+        
+        if attempt == max_retries - 1:
+            logger.warning("API call failed after %s attempts: %s", max_retries, error)
+            return None
+        
+        wait_time = backoff(attempt, error)
+        logger.warning("API call failed (attempt %s/%s): %s", attempt + 1, max_retries, error)
+        logger.warning("Retrying in %s seconds...", f"{wait_time:.1f}")
+        return wait_time
     
     @staticmethod
     def retry_with_backoff(
-        func: Callable[..., T], 
-        max_retries: int = 3, 
+        func: Callable[..., T],
+        max_retries: int = 3,
         delay_factor: float = 2.0,
-        *args, 
+        *args,
+        min_backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        is_retryable: Optional[Callable[[Exception], bool]] = None,
+        backoff: Optional[Callable[[int, Exception], float]] = None,
         **kwargs
     ) -> T:
         """
@@ -41,41 +197,90 @@ class RetryHandler:
         
         Args:
             func: Function to retry
-            max_retries: Maximum number of retry attempts
+            max_retries: Maximum number of attempts
             delay_factor: Exponential backoff factor
-            *args, **kwargs: Arguments to pass to the function
+            *args: Positional arguments to pass to the function
+            min_backoff: Wait time after the first failed attempt (keyword-only)
+            max_backoff: Upper bound for the computed wait time (keyword-only)
+            is_retryable: Returns whether an error is worth retrying (keyword-only,
+                defaults to ``is_retryable_error``)
+            backoff: Returns the wait time for a failed attempt and its error
+                (keyword-only, defaults to ``compute_backoff``)
+            **kwargs: Keyword arguments to pass to the function
             
         Returns:
             Result of the function call
             
         Raises:
-            The last exception encountered if all retries fail
+            The last exception encountered if all retries fail, or the first
+            non-retryable one
         """
-        last_exception = None
+        is_retryable = is_retryable or RetryHandler.is_retryable_error
+        backoff = backoff or (lambda attempt, error: RetryHandler.compute_backoff(
+            attempt, error, delay_factor, min_backoff, max_backoff
+        ))
         
         for attempt in range(max_retries):
             try:
                 return func(*args, **kwargs)
             except Exception as e:
-                last_exception = e
-                
-                # Check if error should be retried
-                if not RetryHandler.is_retryable_error(e):
-                    print(f"Non-retryable error: {str(e)}")
-                    raise e
-                
-                if attempt < max_retries - 1:
-                    wait_time = delay_factor ** attempt
-                    print(f"API call failed (attempt {attempt + 1}/{max_retries}): {str(e)}")
-                    print(f"Retrying in {wait_time:.1f} seconds...")
-                    time.sleep(wait_time)
-                else:
-                    print(f"API call failed after {max_retries} attempts: {str(e)}")
-        
-        if last_exception:
-            raise last_exception
-        else:
-            raise Exception("API call failed with unknown error")
+                wait_time = RetryHandler._wait_before_retry(
+                    attempt, max_retries, e, is_retryable, backoff
+                )
+                if wait_time is None:
+                    raise
+                time.sleep(wait_time)
+        
+        raise Exception("API call failed with unknown error")
+    
+    @staticmethod
+    async def retry_with_backoff_async(
+        coro_factory: Callable[[], Awaitable[T]],
+        max_retries: int = 3,
+        delay_factor: float = 2.0,
+        min_backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        is_retryable: Optional[Callable[[Exception], bool]] = None,
+        backoff: Optional[Callable[[int, Exception], float]] = None
+    ) -> T:
+        """
+        Retry a coroutine with exponential backoff without blocking the event loop.
+        
+        Args:
+            coro_factory: Callable returning a fresh coroutine for each attempt
+            max_retries: Maximum number of attempts
+            delay_factor: Exponential backoff factor
+            min_backoff: Wait time after the first failed attempt
+            max_backoff: Upper bound for the computed wait time
+            is_retryable: Returns whether an error is worth retrying (defaults to
+                ``is_retryable_error``)
+            backoff: Returns the wait time for a failed attempt and its error
+                (defaults to ``compute_backoff``)
+            
+        Returns:
+            Result of the awaited coroutine
+            
+        Raises:
+            The last exception encountered if all retries fail, or the first
+            non-retryable one
+        """
+        is_retryable = is_retryable or RetryHandler.is_retryable_error
+        backoff = backoff or (lambda attempt, error: RetryHandler.compute_backoff(
+            attempt, error, delay_factor, min_backoff, max_backoff
+        ))
+        
+        for attempt in range(max_retries):
+            try:
+                return await coro_factory()
+            except Exception as e:
+                wait_time = RetryHandler._wait_before_retry(
+                    attempt, max_retries, e, is_retryable, backoff
+                )
+                if wait_time is None:
+                    raise
+                await asyncio.sleep(wait_time)
+        
+        raise Exception("API call failed with unknown error")
 
 
 def with_retry(max_retries: int = 3, delay_factor: float = 2.0):
@@ -9,6 +9,7 @@ Usage:
     python run_tts.py input.txt output.wav
     python run_tts.py input.txt output.wav --skip-cleaning
     python run_tts.py input.txt output.wav --skip-translation
+    python run_tts.py input.txt output.wav --save-cleaned
     python run_tts.py input.txt output.wav --source-lang Chinese --target-lang English
 """
 
@@ -19,12 +20,11 @@ import os
 from pathlib import Path
 
 # Import existing services
+from cli import setup_logging
 from config import PipelineConfig, OCRConfig, TTSConfig, ProcessingConfig, TranslationConfig
 from file_manager import FileManager
+from rate_limiter import TokenBucketRateLimiter
 from tts_service import TTSService
-from text_processor import TextProcessor
-from translation_service import TranslationService
-from ocr_service import OCRService
 
 
 class SimpleTTSRunner:
@@ -35,7 +35,8 @@ class SimpleTTSRunner:
                  voice: str = "en-US-JennyNeural", 
                  model_name: str = "openai/o4-mini",
                  endpoint: str = "https://models.github.ai/inference",
-                 token_path: str = "access_token/github_pat"):
+                 token_path: str = "access_token/github_pat",
+                 save_cleaned: bool = False):
         """
         Initialize the TTS runner.
         
@@ -48,6 +49,7 @@ class SimpleTTSRunner:
             model_name: Model name for text processing and translation
             endpoint: API endpoint for the model
             token_path: Path to the authentication token file
+            save_cleaned: Save the cleaned text next to the input file
         """
         # Create configuration
         self.config = PipelineConfig(
@@ -66,39 +68,50 @@ class SimpleTTSRunner:
         )
         
         # Initialize services (lazy loading for efficiency)
-        self._ocr_service = None
+        self._client_factory = None
+        # Cleaning and translation requests go to the same endpoint and share its rate limit
+        self.limiter = TokenBucketRateLimiter(self.config.ocr.request_rate)
         self._text_processor = None
         self._translation_service = None
         self.tts_service = TTSService(self.config.tts)
         
         self.skip_cleaning = skip_cleaning
         self.skip_translation = skip_translation
+        self.save_cleaned = save_cleaned
     
     @property
-    def ocr_service(self):
-        """Lazy initialization of OCR service (needed for text processing and translation)."""
-        if self._ocr_service is None:
-            self._ocr_service = OCRService(self.config.ocr)
-        return self._ocr_service
+    def client_factory(self):
+        """Lazy initialization of the API clients shared by cleaning and translation."""
+        if self._client_factory is None:
+            from client_factory import ClientFactory
+            self._client_factory = ClientFactory(
+                self.config.ocr.github_token_path, self.config.ocr.max_concurrency * 2
+            )
+        return self._client_factory
     
     @property
     def text_processor(self):
         """Lazy initialization of text processor."""
         if self._text_processor is None:
-            self._text_processor = TextProcessor(self.ocr_service.client, self.config.ocr)
+            # Imported here so runs that skip cleaning don't load the API client
+            from text_processor import TextProcessor
+            self._text_processor = TextProcessor(
+                self.config.ocr, self.client_factory, self.limiter
+            )
         return self._text_processor
     
     @property
     def translation_service(self):
         """Lazy initialization of translation service."""
         if self._translation_service is None:
-            # Ensure OCR service client is initialized
-            if self.ocr_service.client is None:
-                raise RuntimeError("OCR service client not initialized. Cannot create translation service.")
-            self._translation_service = TranslationService(self.ocr_service.client, self.config.ocr)
+            from translation_service import TranslationService
+            self._translation_service = TranslationService(
+                self.config.ocr, self.config.translation,
+                client_factory=self.client_factory, limiter=self.limiter
+            )
         return self._translation_service
     
-    def clean_text(self, text: str) -> str:
+    async def clean_text(self, text: str) -> str:
         """
         Clean the input text using the existing text processor.
         
@@ -113,11 +126,13 @@ class SimpleTTSRunner:
             return text
         
         print("🧹 Cleaning text...")
-        return self.text_processor.clean_extracted_text(text)
+        return await self.text_processor.clean_extracted_text_async(
+            text, self.config.processing.clean_chunk_size
+        )
     
-    def translate_text(self, text: str) -> str:
+    async def translate_text(self, text: str) -> str:
         """
-        Translate text if translation is enabled.
+        Translate text if translation is enabled, sending the requests concurrently.
         
         Args:
             text: Text to translate
@@ -136,7 +151,9 @@ class SimpleTTSRunner:
         
         if source_lang == "auto":
             # Auto-detect source language
-            detected_language = self.translation_service.detect_language(text)
+            detected_language = await asyncio.to_thread(
+                self.translation_service.detect_language, text
+            )
             print(f"🔍 Auto-detected source language: {detected_language}")
             
             # Skip translation if already in target language
@@ -146,7 +163,7 @@ class SimpleTTSRunner:
             
             source_lang = detected_language
         
-        return self.translation_service.translate_text(text, source_lang, target_lang)
+        return await self.translation_service.translate_text_async(text, source_lang, target_lang)
     
     async def convert_to_speech(self, text: str, output_path: str) -> None:
         """
@@ -177,12 +194,14 @@ class SimpleTTSRunner:
         print(f"📊 Loaded {len(text):,} characters")
         
         # Step 2: Clean text (optional)
-        cleaned_text = self.clean_text(text)
-        with open(Path(input_text_file).with_suffix('.cleaned.txt'), 'w', encoding='utf-8') as f:
-            f.write(cleaned_text)
+        cleaned_text = await self.clean_text(text)
+        if self.save_cleaned:
+            await FileManager.save_text_async(
+                cleaned_text, str(Path(input_text_file).with_suffix('.cleaned.txt'))
+            )
         
         # Step 3: Translate text (optional)
-        final_text = self.translate_text(cleaned_text)
+        final_text = await self.translate_text(cleaned_text)
         
         # Step 4: Convert to speech
         # Ensure output directory exists
@@ -217,6 +236,8 @@ Examples:
                         help="Skip text cleaning step")
     parser.add_argument("--skip-translation", action="store_true", 
                         help="Skip translation step")
+    parser.add_argument("--save-cleaned", action="store_true",
+                        help="Save the cleaned text next to the input file (as <input>.cleaned.txt)")
     
     # Translation options
     parser.add_argument("--source-lang", default="auto",
@@ -243,6 +264,8 @@ async def main():
     """Main entry point."""
     try:
         args = parse_arguments()
+        # FileManager reports what it loads and saves through logging
+        setup_logging()
         
         # Validate input file exists
         if not os.path.exists(args.input_text):
@@ -258,7 +281,8 @@ async def main():
             voice=args.voice,
             model_name=args.model_name,
             endpoint=args.endpoint,
-            token_path=args.token_path
+            token_path=args.token_path,
+            save_cleaned=args.save_cleaned
         )
         
         # Process text to audio
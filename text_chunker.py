@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Sentence-aware text chunking for size-limited API requests.
+"""
+
+import re
+from typing import AsyncIterator, List
+
+try:
+    from blingfire import text_to_sentences_and_offsets
+except ImportError:
+    text_to_sentences_and_offsets = None
+
+# Whitespace following sentence-ending punctuation (Latin and CJK)
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?。！？])\s+")
+
+
+def _sentence_starts(text: str) -> List[int]:
+    """Get the start offset of every sentence in the text."""
+    if text_to_sentences_and_offsets is not None:
+        # blingfire scans with a compiled DFA, far faster than a regex on book-sized text
+        _, offsets = text_to_sentences_and_offsets(text)
+        starts = [start for start, _ in offsets]
+        if starts:
+            starts[0] = 0
+            return starts
+        return [0]
+    
+    return [0] + [match.end() for match in _SENTENCE_BREAK.finditer(text)]
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences.
+    
+    Whitespace between sentences stays attached to the preceding sentence, so
+    joining the result gives back the original text.
+    
+    Args:
+        text: Text to split
+        
+    Returns:
+        List of sentences
+    """
+    if not text:
+        return []
+    
+    starts = _sentence_starts(text)
+    ends = starts[1:] + [len(text)]
+    return [text[start:end] for start, end in zip(starts, ends) if end > start]
+
+
+def _split_long_sentence(sentence: str, max_chunk_size: int) -> List[str]:
+    """Split a sentence longer than the limit, preferring whitespace boundaries."""
+    pieces = []
+    while len(sentence) > max_chunk_size:
+        cut = sentence.rfind(" ", 0, max_chunk_size) + 1 or max_chunk_size
+        pieces.append(sentence[:cut])
+        sentence = sentence[cut:]
+    if sentence:
+        pieces.append(sentence)
+    return pieces
+
+
+def chunk_text(text: str, max_chunk_size: int) -> List[str]:
+    """
+    Pack whole sentences into chunks of at most ``max_chunk_size`` characters.
+    
+    Args:
+        text: Text to split
+        max_chunk_size: Maximum number of characters per chunk
+        
+    Returns:
+        List of chunks (joining them gives back the original text)
+    """
+    if len(text) <= max_chunk_size:
+        return [text] if text else []
+    
+    chunks = []
+    current: List[str] = []
+    current_size = 0
+    
+    for sentence in split_sentences(text):
+        if len(sentence) > max_chunk_size:
+            pieces = _split_long_sentence(sentence, max_chunk_size)
+        else:
+            pieces = [sentence]
+        
+        for piece in pieces:
+            if current and current_size + len(piece) > max_chunk_size:
+                chunks.append("".join(current))
+                current = []
+                current_size = 0
+            current.append(piece)
+            current_size += len(piece)
+    
+    if current:
+        chunks.append("".join(current))
+    
+    return chunks
+
+
+async def rechunk_stream(texts: AsyncIterator[str], max_chunk_size: int) -> AsyncIterator[str]:
+    """
+    Regroup a stream of text pieces into sentence-aligned chunks.
+    
+    Pieces are buffered until they overflow ``max_chunk_size``; every chunk except
+    the last (possibly unfinished) one is then passed on.
+    
+    Args:
+        texts: Text pieces (e.g. OCRed pages), in order
+        max_chunk_size: Maximum number of characters per chunk
+        
+    Yields:
+        Chunks (joining them gives back the concatenated pieces)
+    """
+    buffer = ""
+    async for text in texts:
+        buffer += text
+        if len(buffer) > max_chunk_size:
+            *ready, buffer = chunk_text(buffer, max_chunk_size)
+            for chunk in ready:
+                yield chunk
+    
+    if buffer:
+        yield buffer
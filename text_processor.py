@@ -3,33 +3,174 @@
 Text processing and cleaning service.
 """
 
-from typing import Optional
-from openai import OpenAI
+import asyncio
+import logging
+import re
+from typing import Any, Dict, List, Optional
+from openai import AsyncOpenAI, OpenAI
 
-from config import OCRConfig
+from client_factory import ClientFactory
+from config import OCRConfig, ProcessingConfig
+from result_cache import CleaningCache
 from retry_handler import RetryHandler
+from text_chunker import chunk_text
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the cleaning prompt changes, so cached cleaning results are redone
+PROMPT_VERSION = 1
+
+# Instructions for the cleaning model
+_CLEANING_SYSTEM_PROMPT = (
+    "You are a text cleaning assistant. "
+    "Your job is to clean up OCR-extracted text by removing unnecessary elements while preserving the actual content. "
+    "Follow these rules strictly:\n\n"
+    "1. Remove any OCR artifacts like '--- OCR Start ---', '--- OCR End ---', '--- Page X ---', or similar separators\n"
+    "2. Remove excessive newline characters (more than 2 consecutive \\n)\n"
+    "3. Remove any metadata or processing comments added by OCR systems\n"
+    "4. Remove any emoji characters\n"
+    "5. Remove inline references such as superscript numbers, footnote markers (e.g., [1], (1), or ^1), and any other common citation indicators embedded within the text.\n"
+    "6. Fix obvious OCR errors in spacing (like 'w o r d s' -> 'words')\n"
+    "7. Preserve original paragraph structure and remove unnecessary line breaks\n"
+    "8. Keep all actual content text intact\n"
+    "9. Do not add any commentary, explanations, or your own text\n"
+    "10. Return only the cleaned text content"
+)
+
+# Shared by every cleaning request; only the user message changes
+_CLEANING_SYSTEM_MESSAGE = {"role": "system", "content": _CLEANING_SYSTEM_PROMPT}
+
+DEFAULT_CLEAN_CHUNK_SIZE = ProcessingConfig().clean_chunk_size
+
+# Mechanical cleaning rules, applied locally before any text is sent to the model
+_OCR_SEPARATOR = re.compile(r"-{3,}\s*(?:OCR\s+(?:Start|End)|Page\s+\d+)\s*-{3,}", re.IGNORECASE)
+_FOOTNOTE_MARKER = re.compile(r"\[\d+\]|\^\d+")
+_EMOJI = re.compile("[\U0001F000-\U0001FFFF\uFE0F]")
+_EXCESS_NEWLINES = re.compile(r"\n{3,}")
+
+# Signs of problems only the model can fix: line breaks inside paragraphs, s p a c e d words
+_HARD_LINE_BREAK = re.compile(r"(?<!\n)\n(?!\n)")
+_SPACED_WORD = re.compile(r"(?<!\S)(?:\w ){3,}\w(?!\S)")
+
+
+def _regex_precleanup(text: str) -> str:
+    """
+    Apply the cleaning rules that don't need a model.
+    
+    Removes OCR separators, footnote markers and emoji, and collapses runs of
+    blank lines.
+    
+    Args:
+        text: Raw OCR extracted text
+        
+    Returns:
+        Partly cleaned text
+    """
+    text = _OCR_SEPARATOR.sub("", text)
+    text = _FOOTNOTE_MARKER.sub("", text)
+    text = _EMOJI.sub("", text)
+    return _EXCESS_NEWLINES.sub("\n\n", text)
+
+
+def _needs_model_cleaning(text: str) -> bool:
+    """Check whether pre-cleaned text still has problems only the model can fix."""
+    return (_HARD_LINE_BREAK.search(text.strip()) is not None or
+            _SPACED_WORD.search(text) is not None)
 
 
 class TextProcessor:
     """Handles text cleaning and processing operations."""
     
-    def __init__(self, client: Optional[OpenAI], config: OCRConfig):
+    def __init__(
+        self, 
+        config: OCRConfig, 
+        client_factory: Optional[ClientFactory] = None, 
+        limiter=None,
+        cache_backend=None
+    ):
         """
         Initialize text processor.
         
         Args:
-            client: OpenAI client for text cleaning
-            config: OCR configuration (for retry settings and model)
+            config: OCR configuration (for endpoint, retry settings and model)
+            client_factory: Source of the (shared) API clients; a private one is
+                created if omitted
+            limiter: Optional rate limiter shared with the other API calls
+            cache_backend: Optional result cache backend for reusing cleaned chunks
         """
-        self.client = client
         self.config = config
+        self.model_name = config.text_model
+        if self.model_name is None:
+            raise ValueError(
+                f"{config.model_name} OCR runs locally; set --llm_model to clean text with an API model"
+            )
+        client_factory = client_factory or ClientFactory(
+            config.github_token_path, config.max_concurrency * 2
+        )
+        # The async client is used for concurrent chunked cleaning
+        self.client: Optional[OpenAI]
+        self.async_client: Optional[AsyncOpenAI]
+        self.client, self.async_client = client_factory.get_clients(config.endpoint)
+        self.limiter = limiter
+        self.cache = (
+            CleaningCache(cache_backend, self.model_name, PROMPT_VERSION)
+            if cache_backend is not None else None
+        )
     
-    def clean_extracted_text(self, raw_text: str) -> str:
+    @staticmethod
+    def _build_cleaning_messages(raw_text: str) -> List[Dict[str, Any]]:
+        """
+        Build the chat messages for a cleaning request.
+        
+        Args:
+            raw_text: Raw OCR extracted text
+            
+        Returns:
+            Messages for the chat completion request
+        """
+        return [
+            _CLEANING_SYSTEM_MESSAGE,
+            {
+                "role": "user", 
+                "content": f"Please clean the following OCR-extracted text:\n\n{raw_text}"
+            }
+        ]
+    
+    def clean_extracted_text(self, raw_text: str, chunk_size: int = DEFAULT_CLEAN_CHUNK_SIZE) -> str:
         """
         Clean extracted text by removing unnecessary characters and LLM-generated separators.
         
+        Synchronous wrapper around ``clean_extracted_text_async``; call that one
+        directly from async code.
+        
+        Args:
+            raw_text: Raw OCR extracted text
+            chunk_size: Maximum number of characters per cleaning request
+            
+        Returns:
+            Cleaned text
+            
+        Raises:
+            RuntimeError: If client is not initialized
+        """
+        return asyncio.run(self.clean_extracted_text_async(raw_text, chunk_size))
+    
+    async def clean_extracted_text_async(
+        self, 
+        raw_text: str, 
+        chunk_size: int = DEFAULT_CLEAN_CHUNK_SIZE
+    ) -> str:
+        """
+        Clean extracted text in chunks that are sent concurrently.
+        
+        Mechanical fixes (separators, footnote markers, emoji, blank lines) are
+        made locally first; only chunks that still need the model are sent to it.
+        The text is split at sentence boundaries, so each request stays well within
+        the model's context window, and chunks that fail to clean are kept as-is.
+        
         Args:
             raw_text: Raw OCR extracted text
+            chunk_size: Maximum number of characters per cleaning request
             
         Returns:
             Cleaned text
@@ -37,57 +178,83 @@ class TextProcessor:
         Raises:
             RuntimeError: If client is not initialized
         """
-        if not self.client:
+        if not self.async_client:
             raise RuntimeError("GitHub client not initialized. Cannot perform text cleaning.")
             
-        print("Cleaning extracted text...")
+        logger.info("Cleaning extracted text...")
         
         if not raw_text.strip():
             return raw_text
         
-        def _make_cleaning_api_call():
-            # Type assertion - caller ensures client is not None
-            assert self.client is not None
-            return self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a text cleaning assistant. "
-                                   "Your job is to clean up OCR-extracted text by removing unnecessary elements while preserving the actual content. "
-                                   "Follow these rules strictly:\n\n"
-                                   "1. Remove any OCR artifacts like '--- OCR Start ---', '--- OCR End ---', '--- Page X ---', or similar separators\n"
-                                   "2. Remove excessive newline characters (more than 2 consecutive \\n)\n"
-                                   "3. Remove any metadata or processing comments added by OCR systems\n"
-                                   "4. Remove any emoji characters\n"
-                                   "5. Remove inline references such as superscript numbers, footnote markers (e.g., [1], (1), or ^1), and any other common citation indicators embedded within the text.\n"
-                                   "6. Fix obvious OCR errors in spacing (like 'w o r d s' -> 'words')\n"
-                                   "7. Preserve original paragraph structure and remove unnecessary line breaks\n"
-                                   "8. Keep all actual content text intact\n"
-                                   "9. Do not add any commentary, explanations, or your own text\n"
-                                   "10. Return only the cleaned text content"
-                    },
-                    {
-                        "role": "user", 
-                        "content": f"Please clean the following OCR-extracted text:\n\n{raw_text}"
-                    }
-                ],
-                model=self.config.model_name,
+        chunks = chunk_text(_regex_precleanup(raw_text), chunk_size)
+        model_chunk_count = sum(1 for chunk in chunks if _needs_model_cleaning(chunk))
+        if model_chunk_count < len(chunks):
+            logger.info(
+                "%s of %s chunks were cleaned without the model",
+                len(chunks) - model_chunk_count, len(chunks)
+            )
+        if model_chunk_count > 1:
+            logger.info("Cleaning %s chunks concurrently...", model_chunk_count)
+        
+        semaphore = asyncio.Semaphore(self.config.max_concurrency)
+        
+        async def _clean(chunk: str) -> str:
+            if not _needs_model_cleaning(chunk):
+                return chunk
+            async with semaphore:
+                cleaned_chunk = await self._clean_chunk_async(chunk)
+            # The model strips surrounding whitespace; restore the break that followed the chunk
+            return cleaned_chunk + chunk[len(chunk.rstrip()):]
+        
+        cleaned_chunks = await asyncio.gather(*(_clean(chunk) for chunk in chunks))
+        cleaned_text = "".join(cleaned_chunks).strip()
+        logger.info("Text cleaned: %s -> %s characters", len(raw_text), len(cleaned_text))
+        return cleaned_text
+    
+    async def _clean_chunk_async(self, chunk: str) -> str:
+        """
+        Clean a single chunk of text.
+        
+        Args:
+            chunk: Part of the raw OCR text
+            
+        Returns:
+            Cleaned chunk, or the original chunk if cleaning failed
+        """
+        # Reruns over the same text don't pay for cleaning again
+        cached_chunk = self.cache.get(chunk) if self.cache else None
+        if cached_chunk:
+            return cached_chunk
+        
+        async def _make_cleaning_api_call():
+            # Type assertion - caller ensures async_client is not None
+            assert self.async_client is not None
+            if self.limiter is not None:
+                await self.limiter.acquire()
+            return await self.async_client.chat.completions.create(
+                messages=self._build_cleaning_messages(chunk),
+                model=self.model_name,
                 temperature=0.1  # Low temperature for consistent cleaning
             )
         
         try:
-            response = RetryHandler.retry_with_backoff(_make_cleaning_api_call, self.config.max_retries)
+            response = await RetryHandler.retry_with_backoff_async(
+                _make_cleaning_api_call,
+                self.config.max_retries,
+                min_backoff=self.config.min_backoff,
+                max_backoff=self.config.max_backoff
+            )
             assert response.choices, "No choices returned from API response"
-            cleaned_text = response.choices[0].message.content
-            if cleaned_text:
-                cleaned_text = cleaned_text.strip()
-                print(f"Text cleaned: {len(raw_text)} -> {len(cleaned_text)} characters")
-                return cleaned_text
-            else:
-                print("Warning: Text cleaning returned empty result, using original text")
-                return raw_text
-                
+            cleaned_chunk = response.choices[0].message.content
+            if cleaned_chunk and cleaned_chunk.strip():
+                cleaned_chunk = cleaned_chunk.strip()
+                if self.cache:
+                    self.cache.put(chunk, cleaned_chunk)
+                return cleaned_chunk
+            logger.warning("Warning: Text cleaning returned empty result for a chunk, using original text")
+            return chunk.strip()
+            
         except Exception as e:
-            print(f"Error cleaning text after {self.config.max_retries} retries: {str(e)}")
-            print("Using original text without cleaning")
-            return raw_text
+            logger.error("Error cleaning text chunk after %s retries: %s", self.config.max_retries, e)
+            logger.info("Using original text for this chunk")
+            return chunk.strip()
@@ -4,25 +4,318 @@ Translation service for the Book OCR to TTS Pipeline.
 Handles text translation using LLM.
 """
 
-from openai import OpenAI
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
-from config import OCRConfig
+from openai import AsyncOpenAI, OpenAI
+
+from client_factory import ClientFactory
+from config import OCRConfig, TranslationConfig
+from result_cache import LanguageCache, TranslationCache
 from retry_handler import RetryHandler
+from text_chunker import chunk_text
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+try:
+    from langdetect import DetectorFactory, LangDetectException, detect_langs
+    # Make detection deterministic across runs
+    DetectorFactory.seed = 0
+except ImportError:
+    detect_langs = None
+
+# Bump when the translation prompt changes, so cached translations from the old prompt are not reused
+PROMPT_VERSION = 2
+
+# Separates the paragraphs of a batched translation request
+_PAGE_MARKER = "\n\n<<<PAGE_{}>>>\n\n"
+_PAGE_MARKER_PATTERN = re.compile(r"\s*<<<PAGE_(\d+)>>>\s*")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+# Letters of the scripts that languages are written in, used to spot sections
+# that are already in the target language's script
+_SCRIPT_LETTERS = {
+    "latin": re.compile(r"[A-Za-z\u00C0-\u024F]"),
+    "han": re.compile(r"[\u3400-\u4DBF\u4E00-\u9FFF]"),
+    "hangul": re.compile(r"[\u1100-\u11FF\uAC00-\uD7AF]"),
+    "cyrillic": re.compile(r"[\u0400-\u04FF]"),
+    "greek": re.compile(r"[\u0370-\u03FF]"),
+    "arabic": re.compile(r"[\u0600-\u06FF]"),
+    "hebrew": re.compile(r"[\u0590-\u05FF]"),
+}
+
+# Script per language name keyword (Japanese is left out: kanji are shared with Chinese)
+_LANGUAGE_SCRIPTS = {
+    "english": "latin", "spanish": "latin", "french": "latin", "german": "latin",
+    "italian": "latin", "portuguese": "latin", "dutch": "latin", "swedish": "latin",
+    "norwegian": "latin", "danish": "latin", "finnish": "latin", "polish": "latin",
+    "czech": "latin", "romanian": "latin", "hungarian": "latin", "turkish": "latin",
+    "vietnamese": "latin", "indonesian": "latin",
+    "chinese": "han", "korean": "hangul",
+    "russian": "cyrillic", "ukrainian": "cyrillic", "bulgarian": "cyrillic", "serbian": "cyrillic",
+    "greek": "greek", "arabic": "arabic", "persian": "arabic", "hebrew": "hebrew",
+}
+
+# Share of a section's letters that must be in the target script for it to be kept as is
+TARGET_SCRIPT_RATIO = 0.95
+
+# Output token budget of a translation request: the input's token count times
+# TRANSLATION_TOKEN_RATIO (some languages need more tokens for the same content),
+# plus a margin
+TRANSLATION_TOKEN_RATIO = 2.0
+TRANSLATION_TOKEN_MARGIN = 256
+
+# Extra output tokens for the hidden reasoning of reasoning models (o1, o3, o4-mini, ...)
+REASONING_TOKEN_ALLOWANCE = 4096
+
+# How often a cut-off translation is requested again, each time with twice the budget
+TRUNCATION_RETRIES = 2
+
+# Model names (without publisher) of reasoning models
+_REASONING_MODEL = re.compile(r"^(?:o\d|gpt-5)", re.IGNORECASE)
+
+# Characters at the start of a text that language detection looks at
+LANGUAGE_SAMPLE_SIZE = 1000
+
+# Output tokens for the language name returned by detection
+DETECTION_MAX_TOKENS = 50
+
+# Minimum probability for a local detection result to be trusted over the model
+LOCAL_DETECTION_CONFIDENCE = 0.9
+
+# English names of the languages langdetect reports, in the style the detection prompt asks for
+_LANGUAGE_NAMES = {
+    "af": "Afrikaans", "ar": "Arabic", "bg": "Bulgarian", "bn": "Bengali", "ca": "Catalan",
+    "cs": "Czech", "cy": "Welsh", "da": "Danish", "de": "German", "el": "Greek",
+    "en": "English", "es": "Spanish", "et": "Estonian", "fa": "Persian", "fi": "Finnish",
+    "fr": "French", "gu": "Gujarati", "he": "Hebrew", "hi": "Hindi", "hr": "Croatian",
+    "hu": "Hungarian", "id": "Indonesian", "it": "Italian", "ja": "Japanese", "kn": "Kannada",
+    "ko": "Korean", "lt": "Lithuanian", "lv": "Latvian", "mk": "Macedonian", "ml": "Malayalam",
+    "mr": "Marathi", "ne": "Nepali", "nl": "Dutch", "no": "Norwegian", "pa": "Punjabi",
+    "pl": "Polish", "pt": "Portuguese", "ro": "Romanian", "ru": "Russian", "sk": "Slovak",
+    "sl": "Slovenian", "so": "Somali", "sq": "Albanian", "sv": "Swedish", "sw": "Swahili",
+    "ta": "Tamil", "te": "Telugu", "th": "Thai", "tl": "Tagalog", "tr": "Turkish",
+    "uk": "Ukrainian", "ur": "Urdu", "vi": "Vietnamese",
+    "zh-cn": "Simplified Chinese", "zh-tw": "Traditional Chinese",
+}
+
+# How often a submitted Batch API job is checked for completion (seconds)
+BATCH_POLL_INTERVAL = 30.0
+
+# Batch API job states after which no more results will arrive
+_BATCH_FINAL_STATES = ("completed", "failed", "expired", "cancelled")
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model_name: str):
+    """Get the tiktoken encoding for a model, or None if tiktoken isn't available."""
+    if tiktoken is None:
+        return None
+    try:
+        # Models are referenced as "<publisher>/<model>" by GitHub Models
+        return tiktoken.encoding_for_model(model_name.rsplit("/", 1)[-1])
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+@lru_cache(maxsize=None)
+def _translation_system_prompt(source_language: str, target_language: str, batched: bool) -> str:
+    """
+    Create the system prompt for translation requests.
+    
+    Everything except the text itself is in the system prompt, so all requests
+    of a book share the same prefix and benefit from the API's prompt caching.
+    
+    Args:
+        source_language: Source language
+        target_language: Target language
+        batched: Whether the text contains page markers that must be kept
+        
+    Returns:
+        System prompt
+    """
+    marker_note = ""
+    if batched:
+        marker_note = "- The text is divided into sections by markers such as <<<PAGE_0>>>; copy every marker unchanged, on its own line, before the translation of its section\n"
+    
+    return f"""You are a professional translator with expertise in multiple languages. Your task is to provide accurate, natural, and culturally appropriate translations while preserving the original meaning, tone, and style.
+
+Translate the text the user sends from {source_language} to {target_language}.
+
+TRANSLATION GUIDELINES:
+1. Maintain the original meaning and context
+2. Use natural, fluent language in the target language
+3. Preserve the tone and style of the original text
+4. Keep proper nouns, names, and technical terms appropriate for the target language
+5. Maintain paragraph structure and formatting
+6. If certain phrases don't have direct translations, provide the most appropriate equivalent
+7. For technical or specialized content, prioritize accuracy over literal translation
+8. If the source language is incorrect or the text contains multiple languages, please translate the predominant language content
+
+IMPORTANT:
+- Provide ONLY the {target_language} translation in your response
+- Do not include explanations, notes, or meta-commentary
+- Do not add prefixes like "Translation:" or "Here is the translation:"
+- Maintain the original text structure including line breaks and paragraphs
+{marker_note}"""
+
+
+def _is_reasoning_model(model_name: str) -> bool:
+    """Check whether a model spends hidden reasoning tokens before answering."""
+    return _REASONING_MODEL.match(model_name.rsplit("/", 1)[-1]) is not None
+
+
+def _split_paragraphs(text: str) -> List[str]:
+    """Split text into non-empty paragraphs."""
+    return [p.strip() for p in _PARAGRAPH_BREAK.split(text) if p.strip()]
+
+
+def _language_script(language: str) -> Optional[str]:
+    """Get the script a language is written in, or None if it isn't known."""
+    for word in language.lower().split():
+        if word in _LANGUAGE_SCRIPTS:
+            return _LANGUAGE_SCRIPTS[word]
+    return None
+
+
+def _needs_translation(text: str, source_script: Optional[str], target_script: Optional[str]) -> bool:
+    """
+    Check whether a section has anything to translate.
+    
+    Sections without letters (page numbers, separators) never need translating.
+    When the source and target languages use different scripts, sections that
+    are almost entirely in the target script (untranslated headers, names) are
+    kept as they are as well.
+    
+    Args:
+        text: Section to check
+        source_script: Script of the source language, if known
+        target_script: Script of the target language, if known
+        
+    Returns:
+        True if the section should be sent to the model
+    """
+    letters = sum(1 for char in text if char.isalpha())
+    if letters == 0:
+        return False
+    if source_script is None or target_script is None or source_script == target_script:
+        return True
+    target_letters = len(_SCRIPT_LETTERS[target_script].findall(text))
+    return target_letters < letters * TARGET_SCRIPT_RATIO
+
+
+def _normalize_whitespace(text: str) -> str:
+    """Collapse whitespace runs, so OCR spacing differences don't hide repeated text."""
+    return " ".join(text.split())
+
+
+def _detect_language_locally(text: str) -> Optional[str]:
+    """
+    Detect the language of a text with langdetect, if installed.
+    
+    Args:
+        text: Text to analyze
+        
+    Returns:
+        Language name, or None if langdetect is unavailable or not confident enough
+    """
+    if detect_langs is None:
+        return None
+    try:
+        best = detect_langs(text)[0]
+    except LangDetectException:
+        return None
+    if best.prob < LOCAL_DETECTION_CONFIDENCE:
+        return None
+    return _LANGUAGE_NAMES.get(best.lang)
+
+
+def count_tokens(text: str, model_name: str) -> int:
+    """
+    Count (or, without tiktoken, estimate) the number of tokens in a text.
+    
+    Args:
+        text: Text to measure
+        model_name: Model whose tokenizer to use
+        
+    Returns:
+        Number of tokens
+    """
+    encoding = _get_encoding(model_name)
+    if encoding is None:
+        # Roughly four characters per token for English text
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+class IncompleteTranslationError(Exception):
+    """Raised when the model's answer was cut off by the output limit, or is empty."""
 
 
 class TranslationService:
     """Service for translating text using LLM."""
     
-    def __init__(self, client: OpenAI, config: OCRConfig):
+    def __init__(
+        self, 
+        config: OCRConfig, 
+        translation_config: Optional[TranslationConfig] = None, 
+        cache_backend=None, 
+        client_factory: Optional[ClientFactory] = None, 
+        limiter=None
+    ):
         """
         Initialize the translation service.
         
         Args:
-            client: OpenAI client instance
-            config: OCR configuration (reused for LLM settings)
+            config: OCR configuration (reused for LLM settings the translation
+                configuration doesn't override)
+            translation_config: Translation configuration (defaults are used if omitted)
+            cache_backend: Optional result cache backend for reusing translations
+            client_factory: Source of the (shared) API clients; a private one is
+                created if omitted
+            limiter: Optional rate limiter shared with the other API calls
         """
-        self.client = client
         self.config = config
+        self.translation_config = translation_config or TranslationConfig()
+        self.endpoint = self.translation_config.endpoint or config.endpoint
+        self.model_name = self.translation_config.model_name or config.text_model
+        if self.model_name is None:
+            raise ValueError(
+                f"{config.model_name} OCR runs locally; set --translation_model or --llm_model "
+                "to translate with an API model"
+            )
+        
+        client_factory = client_factory or ClientFactory(
+            config.github_token_path, config.max_concurrency * 2
+        )
+        # The async client is used for concurrent batched translation
+        self.client: OpenAI
+        self.async_client: Optional[AsyncOpenAI]
+        self.client, self.async_client = client_factory.get_clients(self.endpoint)
+        self.cache = (
+            TranslationCache(cache_backend, self.model_name, PROMPT_VERSION)
+            if cache_backend is not None else None
+        )
+        self.language_cache = (
+            LanguageCache(cache_backend, self.model_name) if cache_backend is not None else None
+        )
+        # Detected languages keyed by text sample hash, so repeated detections are free
+        self._detected_languages: Dict[str, str] = {}
+        self.limiter = limiter
+        # Shared by all concurrent translate_pages_async calls (e.g. streamed chunks),
+        # so together they stay within the request limit
+        self._semaphore = asyncio.Semaphore(config.max_concurrency)
     
     def translate_text(
         self, 
@@ -47,96 +340,754 @@ class TranslationService:
         if not text or not text.strip():
             return ""
         
-        print(f"🌐 Translating from {source_language} to {target_language}...")
-        print(f"📝 Input text length: {len(text):,} characters")
+        logger.info("🌐 Translating from %s to %s...", source_language, target_language)
+        logger.info("📝 Input text length: %s characters", f"{len(text):,}")
         
-        # Create translation prompt
-        prompt = self._create_translation_prompt(text, source_language, target_language)
+        try:
+            if self.translation_config.use_batch_api:
+                translate_pages = self.translate_pages_batch_api
+            else:
+                translate_pages = self.translate_pages
+            paragraphs = self._split_sections(text)
+            translated_text = self._join_sections(paragraphs, translate_pages(
+                [piece for pieces in paragraphs for piece in pieces],
+                source_language, target_language
+            ))
+            
+            logger.info("✅ Translation completed")
+            logger.info("📄 Output text length: %s characters", f"{len(translated_text):,}")
+            
+            return translated_text
+            
+        except Exception as e:
+            error_msg = f"[Error] Translation failed: {str(e)}"
+            logger.error("❌ %s", error_msg)
+            return error_msg
+    
+    async def translate_text_async(
+        self, 
+        text: str, 
+        source_language: str, 
+        target_language: str
+    ) -> str:
+        """
+        Translate text, sending the batched requests concurrently.
         
-        # Perform translation with retry
-        def _translate():
-            response = self.client.chat.completions.create(
-                model=self.config.model_name,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a professional translator with expertise in multiple languages. Your task is to provide accurate, natural, and culturally appropriate translations while preserving the original meaning, tone, and style."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=len(text) * 3,  # Allow for expansion during translation
-                temperature=0.1  # Low temperature for consistent translations
-            )
-            content = response.choices[0].message.content
-            return content.strip() if content else ""
+        Args:
+            text: Text to translate
+            source_language: Source language (e.g., "English", "Chinese", "Spanish")
+            target_language: Target language (e.g., "English", "Chinese", "Spanish")
+            
+        Returns:
+            Translated text
+        """
+        if not text or not text.strip():
+            return ""
+        
+        logger.info("🌐 Translating from %s to %s...", source_language, target_language)
+        logger.info("📝 Input text length: %s characters", f"{len(text):,}")
         
         try:
-            translated_text = RetryHandler.retry_with_backoff(
-                _translate,
-                max_retries=self.config.max_retries
-            )
+            paragraphs = self._split_sections(text)
+            sections = [piece for pieces in paragraphs for piece in pieces]
+            if self.translation_config.use_batch_api:
+                # Waiting for the job is blocking, so it happens off the event loop
+                translated_pages = await asyncio.to_thread(
+                    self.translate_pages_batch_api, sections, source_language, target_language
+                )
+            else:
+                translated_pages = await self.translate_pages_async(
+                    sections, source_language, target_language
+                )
+            translated_text = self._join_sections(paragraphs, translated_pages)
             
-            print("✅ Translation completed")
-            print(f"📄 Output text length: {len(translated_text):,} characters")
+            logger.info("✅ Translation completed")
+            logger.info("📄 Output text length: %s characters", f"{len(translated_text):,}")
             
             return translated_text
             
         except Exception as e:
             error_msg = f"[Error] Translation failed: {str(e)}"
-            print(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             return error_msg
     
-    def _create_translation_prompt(
+    def _split_sections(self, text: str) -> List[List[str]]:
+        """
+        Split text into paragraphs, and paragraphs too large for one request
+        into sentence-aligned pieces.
+        
+        Args:
+            text: Text to split
+            
+        Returns:
+            List of paragraphs, each a list of one or more pieces
+        """
+        max_tokens = self.translation_config.max_batch_tokens
+        paragraphs = []
+        for paragraph in _split_paragraphs(text):
+            tokens = count_tokens(paragraph, self.model_name)
+            if tokens <= max_tokens:
+                paragraphs.append([paragraph])
+                continue
+            # Characters per request, at this paragraph's own characters-per-token rate
+            max_chars = max(1, len(paragraph) * max_tokens // tokens)
+            paragraphs.append([
+                piece.strip() for piece in chunk_text(paragraph, max_chars) if piece.strip()
+            ])
+        return paragraphs
+    
+    @staticmethod
+    def _join_sections(paragraphs: List[List[str]], translations: List[str]) -> str:
+        """Reassemble translated pieces into the paragraph structure from ``_split_sections``."""
+        pieces = iter(translations)
+        return "\n\n".join(
+            " ".join(next(pieces) for _ in paragraph) for paragraph in paragraphs
+        )
+    
+    def translate_pages(
         self, 
-        text: str, 
+        pages: List[str], 
+        source_language: str, 
+        target_language: str
+    ) -> List[str]:
+        """
+        Translate a list of pages, packing several pages into each request.
+        
+        Args:
+            pages: Pages (or paragraphs) to translate
+            source_language: Source language
+            target_language: Target language
+            
+        Returns:
+            Translated pages, in the same order
+            
+        Raises:
+            Exception: If translation fails after all retries
+        """
+        translated_pages, missing, batches = self._plan_batches(
+            pages, source_language, target_language
+        )
+        
+        position = 0
+        for i, batch in enumerate(batches):
+            if len(batches) > 1:
+                logger.info("Translating request %s/%s (%s section(s))...", i+1, len(batches), len(batch))
+            translations = self._translate_batch(batch, source_language, target_language)
+            self._store_batch(
+                batch, translations, missing[position:position + len(batch)],
+                translated_pages, source_language, target_language
+            )
+            position += len(batch)
+        return self._fill_repeats(pages, translated_pages)
+    
+    async def translate_pages_async(
+        self, 
+        pages: List[str], 
         source_language: str, 
         target_language: str
+    ) -> List[str]:
+        """
+        Translate a list of pages, sending the batched requests concurrently.
+        
+        Args:
+            pages: Pages (or paragraphs) to translate
+            source_language: Source language
+            target_language: Target language
+            
+        Returns:
+            Translated pages, in the same order
+            
+        Raises:
+            RuntimeError: If the async client is not initialized
+            Exception: If translation fails after all retries
+        """
+        if not self.async_client:
+            raise RuntimeError("GitHub client not initialized. Cannot perform translation.")
+        
+        translated_pages, missing, batches = self._plan_batches(
+            pages, source_language, target_language
+        )
+        
+        async def _translate(batch_index: int, batch: List[str], offset: int) -> None:
+            async with self._semaphore:
+                if len(batches) > 1:
+                    logger.info(
+                        "Translating request %s/%s (%s section(s))...",
+                        batch_index+1, len(batches), len(batch)
+                    )
+                translations = await self._translate_batch_async(
+                    batch, source_language, target_language
+                )
+            self._store_batch(
+                batch, translations, missing[offset:offset + len(batch)],
+                translated_pages, source_language, target_language
+            )
+        
+        offsets = [0]
+        for batch in batches[:-1]:
+            offsets.append(offsets[-1] + len(batch))
+        await asyncio.gather(*(
+            _translate(i, batch, offset) for i, (batch, offset) in enumerate(zip(batches, offsets))
+        ))
+        return self._fill_repeats(pages, translated_pages)
+    
+    def translate_pages_batch_api(
+        self, 
+        pages: List[str], 
+        source_language: str, 
+        target_language: str
+    ) -> List[str]:
+        """
+        Translate a list of pages through a single OpenAI Batch API job.
+        
+        Batch jobs cost half as much as regular requests but may take up to 24
+        hours, which suits offline book processing. Requests the job doesn't
+        answer are sent again individually.
+        
+        Args:
+            pages: Pages (or paragraphs) to translate
+            source_language: Source language
+            target_language: Target language
+            
+        Returns:
+            Translated pages, in the same order
+            
+        Raises:
+            Exception: If the job can't be submitted or a fallback request fails
+        """
+        translated_pages, missing, batches = self._plan_batches(
+            pages, source_language, target_language
+        )
+        if not batches:
+            return translated_pages
+        
+        lines = []
+        for i, batch in enumerate(batches):
+            text = batch[0] if len(batch) == 1 else self._mark_batch(batch)
+            lines.append(json.dumps({
+                "custom_id": f"batch-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._build_request(text, source_language, target_language, len(batch) > 1)
+            }, ensure_ascii=False))
+        
+        responses = self._run_batch_job("\n".join(lines).encode("utf-8"))
+        
+        position = 0
+        for i, batch in enumerate(batches):
+            response = responses.get(f"batch-{i}")
+            translations = None
+            if response is not None:
+                if len(batch) == 1:
+                    translations = [response]
+                else:
+                    translations = self._split_batch_response(response, len(batch))
+            if translations is None:
+                # Failed, expired or mangled in the job, so retry it the regular way
+                translations = self._translate_batch(batch, source_language, target_language)
+            self._store_batch(
+                batch, translations, missing[position:position + len(batch)],
+                translated_pages, source_language, target_language
+            )
+            position += len(batch)
+        return self._fill_repeats(pages, translated_pages)
+    
+    def _run_batch_job(self, jsonl: bytes) -> Dict[str, str]:
+        """
+        Submit a Batch API job and wait for its results.
+        
+        Args:
+            jsonl: Request file contents, one request per line
+            
+        Returns:
+            Response text per request ``custom_id`` (failed, cut-off and empty
+            answers are left out)
+        """
+        input_file = self.client.files.create(
+            file=("translations.jsonl", jsonl), purpose="batch"
+        )
+        job = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        logger.info("📮 Submitted translation batch job %s, waiting for results...", job.id)
+        
+        while job.status not in _BATCH_FINAL_STATES:
+            time.sleep(BATCH_POLL_INTERVAL)
+            job = self.client.batches.retrieve(job.id)
+        
+        if job.status != "completed":
+            logger.warning("⚠️  Batch job %s ended as '%s'", job.id, job.status)
+        if not job.output_file_id:
+            return {}
+        
+        responses = {}
+        for line in self.client.files.content(job.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            response = result.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            choice = response["body"]["choices"][0]
+            # Cut-off and empty answers are left out, so they get translated the regular way
+            if choice.get("finish_reason") != "length" and (choice["message"]["content"] or "").strip():
+                responses[result["custom_id"]] = choice["message"]["content"].strip()
+        logger.info("✅ Batch job %s returned %s response(s)", job.id, len(responses))
+        return responses
+    
+    def _plan_batches(
+        self, 
+        pages: List[str], 
+        source_language: str, 
+        target_language: str
+    ) -> Tuple[List[Optional[str]], List[int], List[List[str]]]:
+        """
+        Fill in cached translations and group the remaining pages into requests.
+        
+        Pages with nothing to translate (see ``_needs_translation``) are kept as
+        they are, and repeated pages (running headers, chapter titles, ...) are
+        sent once; see ``_fill_repeats``.
+        
+        Args:
+            pages: Pages to translate
+            source_language: Source language
+            target_language: Target language
+            
+        Returns:
+            Tuple of (translations with None for missing pages, indices of the
+            distinct missing pages, batches of those pages in index order)
+        """
+        translated_pages: List[Optional[str]] = [None] * len(pages)
+        if self.cache:
+            for i, page in enumerate(pages):
+                translated_pages[i] = self.cache.get(page, source_language, target_language)
+        
+        # Only pages without a cached translation are sent to the API
+        missing = [i for i, translation in enumerate(translated_pages) if translation is None]
+        if len(missing) < len(pages):
+            logger.info("💾 Reusing %s cached translation(s)", len(pages) - len(missing))
+        
+        source_script = _language_script(source_language)
+        target_script = _language_script(target_language)
+        untranslated = [
+            i for i in missing if not _needs_translation(pages[i], source_script, target_script)
+        ]
+        if untranslated:
+            logger.info(
+                "⏭️  Keeping %s section(s) without %s text as they are",
+                len(untranslated), source_language
+            )
+            for i in untranslated:
+                translated_pages[i] = pages[i]
+            missing = [i for i in missing if translated_pages[i] is None]
+        
+        seen = set()
+        distinct = []
+        for i in missing:
+            key = _normalize_whitespace(pages[i])
+            if key not in seen:
+                seen.add(key)
+                distinct.append(i)
+        if len(distinct) < len(missing):
+            logger.info("♻️  %s repeated section(s) will reuse one translation", len(missing) - len(distinct))
+        missing = distinct
+        
+        batches = self._pack_batches([pages[i] for i in missing])
+        if batches:
+            logger.info("📦 Translating %s section(s) in %s request(s)", len(missing), len(batches))
+        return translated_pages, missing, batches
+    
+    @staticmethod
+    def _fill_repeats(pages: List[str], translated_pages: List[Optional[str]]) -> List[str]:
+        """
+        Give repeated pages the translation of their first occurrence.
+        
+        Args:
+            pages: Pages that were translated
+            translated_pages: Translations, with None for pages left out as repeats
+            
+        Returns:
+            Complete list of translations
+        """
+        translations = {}
+        for page, translation in zip(pages, translated_pages):
+            if translation is not None:
+                translations.setdefault(_normalize_whitespace(page), translation)
+        return [
+            translation if translation is not None else translations[_normalize_whitespace(page)]
+            for page, translation in zip(pages, translated_pages)
+        ]
+    
+    def _store_batch(
+        self, 
+        batch: List[str], 
+        translations: List[str], 
+        indices: List[int], 
+        translated_pages: List[Optional[str]], 
+        source_language: str, 
+        target_language: str
+    ) -> None:
+        """Place the translations of a batch at their page positions and cache them."""
+        for page, translation, index in zip(batch, translations, indices):
+            translated_pages[index] = translation
+            # An empty translation would be reused as a cache hit on every later run
+            if self.cache and translation.strip():
+                self.cache.put(page, source_language, target_language, translation)
+    
+    def _pack_batches(self, pages: List[str]) -> List[List[str]]:
+        """
+        Greedily group consecutive pages into batches that fit the token budget
+        and the section limit.
+        
+        Args:
+            pages: Pages to group
+            
+        Returns:
+            List of batches (a page larger than the budget forms its own batch)
+        """
+        max_tokens = self.translation_config.max_batch_tokens
+        max_sections = self.translation_config.max_batch_sections
+        batches: List[List[str]] = []
+        current: List[str] = []
+        current_tokens = 0
+        
+        for page in pages:
+            page_tokens = count_tokens(page, self.model_name)
+            if current and (current_tokens + page_tokens > max_tokens or
+                            len(current) >= max_sections):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(page)
+            current_tokens += page_tokens
+        
+        if current:
+            batches.append(current)
+        return batches
+    
+    @staticmethod
+    def _mark_batch(batch: List[str]) -> str:
+        """Join the pages of a batch, each preceded by its page marker."""
+        return "".join(_PAGE_MARKER.format(i) + page for i, page in enumerate(batch))
+    
+    @staticmethod
+    def _split_batch_response(response: str, page_count: int) -> Optional[List[str]]:
+        """
+        Split a batched translation back into pages.
+        
+        Args:
+            response: Translated text containing page markers
+            page_count: Number of pages in the batch
+            
+        Returns:
+            Translated pages, or None if markers were lost or mangled
+        """
+        # re.split with a capture group gives [preamble, index, text, index, text, ...]
+        parts = _PAGE_MARKER_PATTERN.split(response)
+        translated = {int(index): page.strip() for index, page in zip(parts[1::2], parts[2::2])}
+        if sorted(translated) != list(range(page_count)):
+            return None
+        return [translated[i] for i in range(page_count)]
+    
+    def _translate_batch(
+        self, 
+        batch: List[str], 
+        source_language: str, 
+        target_language: str
+    ) -> List[str]:
+        """
+        Translate a batch of pages with a single request.
+        
+        Args:
+            batch: Pages to translate together
+            source_language: Source language
+            target_language: Target language
+            
+        Returns:
+            Translated pages, in the same order
+        """
+        if len(batch) == 1:
+            return [self._request_translation(batch[0], source_language, target_language)]
+        
+        try:
+            response = self._request_translation(
+                self._mark_batch(batch), source_language, target_language, batched=True
+            )
+        except IncompleteTranslationError as e:
+            # Smaller requests need smaller outputs
+            middle = len(batch) // 2
+            logger.warning(
+                "⚠️  %s, splitting the request into two of %s and %s sections",
+                e, middle, len(batch) - middle
+            )
+            return (self._translate_batch(batch[:middle], source_language, target_language) +
+                    self._translate_batch(batch[middle:], source_language, target_language))
+        
+        translated = self._split_batch_response(response, len(batch))
+        if translated is not None:
+            return translated
+        
+        # The model dropped or mangled markers, so the pages can't be matched up
+        logger.warning(
+            "⚠️  Batched response lost page markers, translating %s sections individually",
+            len(batch)
+        )
+        return [
+            self._request_translation(page, source_language, target_language)
+            for page in batch
+        ]
+    
+    async def _translate_batch_async(
+        self, 
+        batch: List[str], 
+        source_language: str, 
+        target_language: str
+    ) -> List[str]:
+        """
+        Translate a batch of pages with a single async request.
+        
+        Args:
+            batch: Pages to translate together
+            source_language: Source language
+            target_language: Target language
+            
+        Returns:
+            Translated pages, in the same order
+        """
+        if len(batch) == 1:
+            return [await self._request_translation_async(batch[0], source_language, target_language)]
+        
+        try:
+            response = await self._request_translation_async(
+                self._mark_batch(batch), source_language, target_language, batched=True
+            )
+        except IncompleteTranslationError as e:
+            # Smaller requests need smaller outputs
+            middle = len(batch) // 2
+            logger.warning(
+                "⚠️  %s, splitting the request into two of %s and %s sections",
+                e, middle, len(batch) - middle
+            )
+            halves = await asyncio.gather(
+                self._translate_batch_async(batch[:middle], source_language, target_language),
+                self._translate_batch_async(batch[middle:], source_language, target_language)
+            )
+            return halves[0] + halves[1]
+        
+        translated = self._split_batch_response(response, len(batch))
+        if translated is not None:
+            return translated
+        
+        # The model dropped or mangled markers, so the pages can't be matched up
+        logger.warning(
+            "⚠️  Batched response lost page markers, translating %s sections individually",
+            len(batch)
+        )
+        return list(await asyncio.gather(*(
+            self._request_translation_async(page, source_language, target_language)
+            for page in batch
+        )))
+    
+    def _output_limit(self, max_output_tokens: int) -> Dict[str, Any]:
+        """
+        Build the output length (and sampling) arguments of a request.
+        
+        Reasoning models take ``max_completion_tokens``, which also has to cover
+        their hidden reasoning, and only support the default temperature.
+        
+        Args:
+            max_output_tokens: Tokens allowed for the visible answer
+            
+        Returns:
+            Chat completion arguments
+        """
+        if _is_reasoning_model(self.model_name):
+            return {"max_completion_tokens": max_output_tokens + REASONING_TOKEN_ALLOWANCE}
+        return {
+            "max_tokens": max_output_tokens,
+            "temperature": 0.1  # Low temperature for consistent translations
+        }
+    
+    def _translation_budget(self, text: str) -> int:
+        """Get the initial output token budget for translating a text."""
+        # A tight output budget keeps the request out of slower long-generation scheduling
+        return (
+            int(count_tokens(text, self.model_name) * TRANSLATION_TOKEN_RATIO)
+            + TRANSLATION_TOKEN_MARGIN
+        )
+    
+    def _build_request(
+        self, 
+        text: str, 
+        source_language: str, 
+        target_language: str, 
+        batched: bool,
+        max_output_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Build the chat completion arguments for a translation request."""
+        return {
+            "model": self.model_name,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": _translation_system_prompt(source_language, target_language, batched)
+                },
+                {
+                    "role": "user",
+                    "content": f"TEXT TO TRANSLATE:\n---\n{text}\n---"
+                }
+            ],
+            **self._output_limit(max_output_tokens or self._translation_budget(text))
+        }
+    
+    def _output_budgets(self, text: str, batched: bool) -> List[int]:
+        """
+        Get the output token budgets to try for a translation request, in order.
+        
+        Batched requests get a single attempt, since splitting the batch is the
+        better remedy for a truncated answer.
+        """
+        budget = self._translation_budget(text)
+        attempts = 1 if batched else 1 + TRUNCATION_RETRIES
+        return [budget * 2 ** attempt for attempt in range(attempts)]
+    
+    @staticmethod
+    def _check_completion(content: Optional[str], finish_reason: Optional[str], budget: int) -> str:
+        """
+        Get the text of a finished completion.
+        
+        Args:
+            content: Message content of the completion
+            finish_reason: Why the model stopped generating
+            budget: Output token budget of the request
+            
+        Returns:
+            Stripped translation
+            
+        Raises:
+            IncompleteTranslationError: If the output was cut off or is empty
+        """
+        if finish_reason == "length":
+            raise IncompleteTranslationError(f"Translation was cut off at {budget} output tokens")
+        text = content.strip() if content else ""
+        if not text:
+            raise IncompleteTranslationError("Model returned an empty translation")
+        return text
+    
+    def _request_translation(
+        self, 
+        text: str, 
+        source_language: str, 
+        target_language: str, 
+        batched: bool = False
     ) -> str:
         """
-        Create a detailed translation prompt for the LLM.
+        Send a single translation request.
+        
+        A cut-off answer is requested again with a doubled output budget (for
+        unbatched text).
         
         Args:
             text: Text to translate
             source_language: Source language
             target_language: Target language
+            batched: Whether the text contains page markers that must be kept
             
         Returns:
-            Translation prompt
+            Translated text
+            
+        Raises:
+            IncompleteTranslationError: If the answer is still cut off or empty
+            Exception: If translation fails after all retries
         """
-        prompt = f"""Please translate the following text from {source_language} to {target_language}.
-
-TRANSLATION GUIDELINES:
-1. Maintain the original meaning and context
-2. Use natural, fluent language in the target language
-3. Preserve the tone and style of the original text
-4. Keep proper nouns, names, and technical terms appropriate for the target language
-5. Maintain paragraph structure and formatting
-6. If certain phrases don't have direct translations, provide the most appropriate equivalent
-7. For technical or specialized content, prioritize accuracy over literal translation
-8. If the source language is incorrect or the text contains multiple languages, please translate the predominant language content
-
-IMPORTANT:
-- Provide ONLY the translated text in your response
-- Do not include explanations, notes, or meta-commentary
-- Do not add prefixes like "Translation:" or "Here is the translation:"
-- Maintain the original text structure including line breaks and paragraphs
-
-TEXT TO TRANSLATE:
----
-{text}
----
-
-Please provide the {target_language} translation:"""
+        budgets = self._output_budgets(text, batched)
+        for attempt, budget in enumerate(budgets):
+            request = self._build_request(text, source_language, target_language, batched, budget)
+            
+            # Perform translation with retry
+            def _translate():
+                response = self.client.chat.completions.create(**request)
+                choice = response.choices[0]
+                return choice.message.content, choice.finish_reason
+            
+            content, finish_reason = RetryHandler.retry_with_backoff(
+                _translate,
+                max_retries=self.config.max_retries,
+                min_backoff=self.config.min_backoff,
+                max_backoff=self.config.max_backoff
+            )
+            try:
+                return self._check_completion(content, finish_reason, budget)
+            except IncompleteTranslationError as e:
+                if finish_reason != "length" or attempt == len(budgets) - 1:
+                    raise
+                logger.warning("⚠️  %s, retrying with %s", e, budgets[attempt + 1])
+        raise IncompleteTranslationError("No output budget left to try")
+    
+    async def _request_translation_async(
+        self, 
+        text: str, 
+        source_language: str, 
+        target_language: str, 
+        batched: bool = False
+    ) -> str:
+        """
+        Send a single translation request without blocking the event loop.
+        
+        A cut-off answer is requested again with a doubled output budget (for
+        unbatched text).
         
-        return prompt
+        Args:
+            text: Text to translate
+            source_language: Source language
+            target_language: Target language
+            batched: Whether the text contains page markers that must be kept
+            
+        Returns:
+            Translated text
+            
+        Raises:
+            IncompleteTranslationError: If the answer is still cut off or empty
+            Exception: If translation fails after all retries
+        """
+        budgets = self._output_budgets(text, batched)
+        for attempt, budget in enumerate(budgets):
+            request = self._build_request(text, source_language, target_language, batched, budget)
+            
+            async def _translate():
+                # Type assertion - caller ensures async_client is not None
+                assert self.async_client is not None
+                if self.limiter is not None:
+                    await self.limiter.acquire()
+                response = await self.async_client.chat.completions.create(**request)
+                choice = response.choices[0]
+                return choice.message.content, choice.finish_reason
+            
+            content, finish_reason = await RetryHandler.retry_with_backoff_async(
+                _translate,
+                max_retries=self.config.max_retries,
+                min_backoff=self.config.min_backoff,
+                max_backoff=self.config.max_backoff
+            )
+            try:
+                return self._check_completion(content, finish_reason, budget)
+            except IncompleteTranslationError as e:
+                if finish_reason != "length" or attempt == len(budgets) - 1:
+                    raise
+                logger.warning("⚠️  %s, retrying with %s", e, budgets[attempt + 1])
+        raise IncompleteTranslationError("No output budget left to try")
     
     def detect_language(self, text: str) -> str:
         """
         Detect the language of the input text.
         
+        The local ``langdetect`` model is tried first when installed; the LLM is
+        only asked when it is unavailable or unsure. Results are cached per text
+        sample (in memory, and in the result cache if one is configured), so the
+        model is asked once per distinct sample.
+        
         Args:
             text: Text to analyze
             
@@ -146,8 +1097,23 @@ Please provide the {target_language} translation:"""
         if not text or not text.strip():
             return "Unknown"
         
-        # Use a sample of the text for detection (first 1000 characters)
-        sample_text = text[:1000]
+        # Use a sample of the text for detection
+        sample_text = text[:LANGUAGE_SAMPLE_SIZE]
+        sample_hash = hashlib.blake2b(sample_text.encode("utf-8"), digest_size=16).hexdigest()
+        
+        cached_language = self._detected_languages.get(sample_hash)
+        if cached_language is None and self.language_cache:
+            cached_language = self.language_cache.get(sample_hash)
+        if cached_language is not None:
+            self._detected_languages[sample_hash] = cached_language
+            logger.info("🔍 Detected language: %s (cached)", cached_language)
+            return cached_language
+        
+        local_language = _detect_language_locally(sample_text)
+        if local_language is not None:
+            self._detected_languages[sample_hash] = local_language
+            logger.info("🔍 Detected language: %s", local_language)
+            return local_language
         
         prompt = f"""Please identify the primary language of the following text.
 
@@ -166,7 +1132,7 @@ Language:"""
         
         def _detect():
             response = self.client.chat.completions.create(
-                model=self.config.model_name,
+                model=self.model_name,
                 messages=[
                     {
                         "role": "system",
@@ -177,8 +1143,7 @@ Language:"""
                         "content": prompt
                     }
                 ],
-                max_tokens=50,
-                temperature=0.1
+                **self._output_limit(DETECTION_MAX_TOKENS)
             )
             content = response.choices[0].message.content
             return content.strip() if content else "Unknown"
@@ -186,12 +1151,18 @@ Language:"""
         try:
             detected_language = RetryHandler.retry_with_backoff(
                 _detect,
-                max_retries=self.config.max_retries
+                max_retries=self.config.max_retries,
+                min_backoff=self.config.min_backoff,
+                max_backoff=self.config.max_backoff
             )
             
-            print(f"🔍 Detected language: {detected_language}")
+            logger.info("🔍 Detected language: %s", detected_language)
+            if detected_language != "Unknown":
+                self._detected_languages[sample_hash] = detected_language
+                if self.language_cache:
+                    self.language_cache.put(sample_hash, detected_language)
             return detected_language
             
         except Exception as e:
-            print(f"❌ Language detection failed: {str(e)}")
+            logger.error("❌ Language detection failed: %s", e)
             return "Unknown"
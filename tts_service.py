@@ -3,14 +3,28 @@
 Text-to-Speech service using Edge TTS.
 """
 
+import asyncio
+import io
+import logging
 import os
+import shutil
 import tempfile
-from typing import List
+from typing import IO, AsyncIterator, Awaitable, List, Optional
 
 import edge_tts
 from pydub import AudioSegment
 
 from config import TTSConfig
+from text_chunker import chunk_text, rechunk_stream
+
+logger = logging.getLogger(__name__)
+
+# Bitrate of the MP3 audio Edge TTS produces (24 kHz mono); output at this bitrate
+# is assembled from the chunks' MP3 frames without re-encoding
+EDGE_TTS_BITRATE = "48k"
+
+# Size up to which a chunk's audio is kept in memory before spilling to a temporary file
+CHUNK_SPOOL_SIZE = 2 * 1024 * 1024
 
 
 class TTSService:
@@ -33,29 +47,28 @@ class TTSService:
             text: Text to convert to speech
             output_path: Path where to save the audio file
         """
-        print(f"Converting text to speech using voice: {self.config.voice}")
+        logger.info("Converting text to speech using voice: %s", self.config.voice)
         
-        # Split text into chunks if it's too long (Edge TTS has limits)
-        chunks = [text[i:i+self.config.max_chunk_size] 
-                 for i in range(0, len(text), self.config.max_chunk_size)]
+        # Split text into chunks at sentence boundaries if it's too long (Edge TTS has limits)
+        chunks = chunk_text(text, self.config.max_chunk_size)
         
         if len(chunks) > 1:
-            print(f"Text split into {len(chunks)} chunks for processing")
+            logger.info("Text split into %s chunks for processing", len(chunks))
             
             # Try chunked processing first
             try:
                 await self._process_chunks_and_combine(chunks, output_path)
                 return
             except Exception as e:
-                print(f"❌ Chunked processing failed: {str(e)}")
-                print("🔄 Falling back to single-chunk processing...")
+                logger.error("❌ Chunked processing failed: %s", e)
+                logger.info("🔄 Falling back to single-chunk processing...")
                 # Fall through to single chunk processing
         
         # Single chunk processing (fallback or original)
-        print("Processing as single chunk...")
+        logger.info("Processing as single chunk...")
         communicate = edge_tts.Communicate(text, self.config.voice)
         await communicate.save(output_path)
-        print(f"Audio saved to: {output_path}")
+        logger.info("Audio saved to: %s", output_path)
     
     async def _process_chunks_and_combine(self, chunks: List[str], output_path: str) -> None:
         """
@@ -65,79 +78,271 @@ class TTSService:
             chunks: List of text chunks to process
             output_path: Path where to save the combined audio
         """
-        temp_files = []
-        audio_segments = []
+        buffers = []
         
         try:
-            # First, generate a small sample to detect Edge TTS audio format
-            sample_communicate = edge_tts.Communicate("test", self.config.voice)
-            sample_fd, sample_path = tempfile.mkstemp(suffix='.mp3')
-            os.close(sample_fd)
-            await sample_communicate.save(sample_path)
+            # Synthesize the chunks concurrently (results come back in text order)
+            semaphore = asyncio.Semaphore(self.config.max_concurrency)
+            chunk_audio = await self._gather_chunks([
+                self._synthesize_chunk_limited(semaphore, i, chunk, buffers, len(chunks))
+                for i, chunk in enumerate(chunks)
+            ])
             
-            # Load sample to detect audio parameters
-            sample_audio = AudioSegment.from_file(sample_path)
-            sample_rate = sample_audio.frame_rate
-            channels = sample_audio.channels
-            sample_format = sample_audio.sample_width * 8  # bits per sample
+            await self._combine_and_export(chunk_audio, output_path)
             
-            print(f"📊 Detected audio format: {sample_rate}Hz, {channels} channel(s), {sample_format}-bit")
+        finally:
+            self._close_buffers(buffers)
+    
+    async def text_stream_to_speech(self, texts: AsyncIterator[str], output_path: str) -> None:
+        """
+        Convert text to speech while the text is still being produced.
+        
+        Each chunk is synthesized as soon as enough text has arrived to fill it,
+        and the chunks are combined once the stream ends.
+        
+        Args:
+            texts: Text pieces, in reading order
+            output_path: Path where to save the audio file
+        """
+        logger.info("Converting text to speech using voice: %s", self.config.voice)
+        buffers = []
+        semaphore = asyncio.Semaphore(self.config.max_concurrency)
+        pending = []
+        
+        try:
+            # Each chunk starts synthesizing as soon as it is complete
+            try:
+                async for chunk in rechunk_stream(texts, self.config.max_chunk_size):
+                    if not chunk.strip():
+                        continue
+                    pending.append(asyncio.ensure_future(
+                        self._synthesize_chunk_limited(semaphore, len(pending), chunk, buffers)
+                    ))
+            except BaseException:
+                await self._cancel_all(pending)
+                raise
             
-            # Clean up sample
-            os.unlink(sample_path)
+            chunk_audio = await self._gather_chunks(pending)
+            if not chunk_audio:
+                raise ValueError("No text to convert to speech")
             
-            # Process each chunk
-            for i, chunk in enumerate(chunks):
-                print(f"Processing chunk {i+1}/{len(chunks)} ({len(chunk)} characters)...")
-                
-                # Create temporary file for this chunk
-                temp_fd, temp_path = tempfile.mkstemp(suffix='.mp3')
-                os.close(temp_fd)
-                temp_files.append(temp_path)
-                
-                # Generate audio for this chunk
-                communicate = edge_tts.Communicate(chunk, self.config.voice)
-                await communicate.save(temp_path)
-                
-                # Load audio segment
-                try:
-                    audio_segment = AudioSegment.from_file(temp_path)
-                    audio_segments.append(audio_segment)
-                except Exception as e:
-                    print(f"Error loading audio chunk {i+1}: {str(e)}")
-                    # Try to read as different formats
-                    for fmt in ['mp3', 'wav', 'webm']:
-                        try:
-                            audio_segment = AudioSegment.from_file(temp_path, format=fmt)
-                            audio_segments.append(audio_segment)
-                            print(f"Successfully loaded chunk {i+1} as {fmt}")
-                            break
-                        except Exception:
-                            continue
-                    else:
-                        raise Exception(f"Could not load audio chunk {i+1} in any supported format")
+            await self._combine_and_export(chunk_audio, output_path)
             
-            # Combine all audio segments
-            print("Combining audio chunks...")
-            combined_audio = audio_segments[0]
-            for segment in audio_segments[1:]:
-                combined_audio += segment
+        finally:
+            self._close_buffers(buffers)
+    
+    @staticmethod
+    async def _gather_chunks(synthesis: List[Awaitable[IO[bytes]]]) -> List[IO[bytes]]:
+        """
+        Wait for all chunk syntheses, in order.
+        
+        If one fails, the others are cancelled and awaited before the error is
+        raised, so none of them is still writing when the buffers are closed.
+        
+        Args:
+            synthesis: Chunk synthesis coroutines or tasks, in text order
+            
+        Returns:
+            Audio buffers of the chunks, in text order
+        """
+        tasks = [asyncio.ensure_future(item) for item in synthesis]
+        try:
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            await TTSService._cancel_all(tasks)
+            raise
+    
+    @staticmethod
+    async def _cancel_all(tasks: List[asyncio.Future]) -> None:
+        """Cancel tasks and wait until they have all stopped."""
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _synthesize_chunk_limited(
+        self, 
+        semaphore: asyncio.Semaphore, 
+        index: int, 
+        chunk: str, 
+        buffers: List[IO[bytes]], 
+        total: Optional[int] = None
+    ) -> IO[bytes]:
+        """Synthesize a chunk once the semaphore allows another request."""
+        async with semaphore:
+            position = f"{index+1}/{total}" if total else f"{index+1}"
+            logger.info("Processing chunk %s (%s characters)...", position, len(chunk))
+            return await self._synthesize_chunk(chunk, buffers)
+    
+    async def _synthesize_chunk(self, chunk: str, buffers: List[IO[bytes]]) -> IO[bytes]:
+        """
+        Generate the MP3 audio of one text chunk into a buffer.
+        
+        The buffer stays in memory unless the chunk's audio outgrows
+        ``CHUNK_SPOOL_SIZE``, so ordinary chunks never touch the disk.
+        
+        Args:
+            chunk: Text of the chunk
+            buffers: List that receives the buffer created for the chunk
+            
+        Returns:
+            Buffer holding the chunk's audio
+        """
+        buffer = tempfile.SpooledTemporaryFile(max_size=CHUNK_SPOOL_SIZE)
+        buffers.append(buffer)
+        
+        # Write the audio as it arrives
+        communicate = edge_tts.Communicate(chunk, self.config.voice)
+        async for message in communicate.stream():
+            if message["type"] == "audio":
+                buffer.write(message["data"])
+        return buffer
+    
+    @staticmethod
+    def _load_chunk(index: int, buffer: IO[bytes]) -> AudioSegment:
+        """
+        Decode the audio of one chunk.
+        
+        Args:
+            index: Zero-based position of the chunk
+            buffer: Buffer holding the chunk's audio
+            
+        Returns:
+            Audio segment of the chunk
+        """
+        try:
+            buffer.seek(0)
+            return AudioSegment.from_file(buffer, format="mp3")
+        except Exception as e:
+            logger.error("Error loading audio chunk %s: %s", index+1, e)
+            # Try to read as different formats
+            for fmt in ['wav', 'webm']:
+                try:
+                    buffer.seek(0)
+                    audio_segment = AudioSegment.from_file(buffer, format=fmt)
+                    logger.info("Successfully loaded chunk %s as %s", index+1, fmt)
+                    return audio_segment
+                except Exception:
+                    continue
+            raise Exception(f"Could not load audio chunk {index+1} in any supported format")
+    
+    async def _combine_and_export(self, chunk_audio: List[IO[bytes]], output_path: str) -> None:
+        """
+        Combine the chunks' audio into the output file.
+        
+        At Edge TTS's own bitrate the MP3 data is joined without re-encoding, since
+        MP3 streams can be concatenated frame by frame. Other bitrates and
+        uncompressed WAV output need decoding and re-encoding with pydub.
+        
+        Args:
+            chunk_audio: Audio buffers of the chunks, in text order
+            output_path: Path where to save the combined audio
+        """
+        logger.info("Combining audio chunks...")
+        if self.config.audio_bitrate == EDGE_TTS_BITRATE:
+            await self._concatenate_mp3(chunk_audio, output_path)
+            if output_path.lower().endswith('.wav'):
+                logger.info("💡 Note: File saved as compressed audio with .wav extension (actual format: MP3)")
+                logger.info("    Compressed size: %s bytes", f"{os.path.getsize(output_path):,}")
+        else:
+            combined_audio = self._decode_chunks(chunk_audio)
+            sample_rate, channels = combined_audio.frame_rate, combined_audio.channels
             
             # Export with optimized settings
-            print("Exporting optimized audio...")
+            logger.info("Exporting optimized audio...")
             await self._export_combined_audio(
                 combined_audio, output_path, sample_rate, channels
             )
+        
+        logger.info("Audio saved to: %s", output_path)
+    
+    def _decode_chunks(self, chunk_audio: List[IO[bytes]]) -> AudioSegment:
+        """
+        Decode the chunks' audio into one audio segment.
+        
+        The MP3 data is joined and decoded in one pass, instead of decoding each
+        chunk and appending it to a growing segment (which copies the whole
+        segment on every append).
+        
+        Args:
+            chunk_audio: Audio buffers of the chunks, in text order
             
-            print(f"Audio saved to: {output_path}")
-            
-        finally:
-            # Clean up temporary files
-            for temp_path in temp_files:
-                try:
-                    os.unlink(temp_path)
-                except OSError:
-                    pass
+        Returns:
+            Combined audio segment
+        """
+        combined = io.BytesIO()
+        for buffer in chunk_audio:
+            buffer.seek(0)
+            shutil.copyfileobj(buffer, combined)
+        combined.seek(0)
+        try:
+            return AudioSegment.from_file(combined, format="mp3")
+        except Exception as e:
+            logger.warning("Error decoding combined audio: %s, decoding chunks one by one", e)
+        
+        combined_audio = self._load_chunk(0, chunk_audio[0])
+        for i, buffer in enumerate(chunk_audio[1:], 1):
+            combined_audio += self._load_chunk(i, buffer)
+        return combined_audio
+    
+    async def _concatenate_mp3(self, chunk_audio: List[IO[bytes]], output_path: str) -> None:
+        """
+        Join MP3 data without re-encoding.
+        
+        When ffmpeg is available the joined data is piped through it with stream
+        copy, which rewrites the frames with clean headers (some players need
+        that at chunk boundaries). Without ffmpeg (or if it fails) the data is
+        written out as is.
+        
+        Args:
+            chunk_audio: Audio buffers of the chunks, in order
+            output_path: Path where to save the combined audio
+        """
+        if shutil.which("ffmpeg") is None:
+            self._concatenate_buffers(chunk_audio, output_path)
+            return
+        
+        process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "mp3", "-i", "pipe:0",
+            # The .wav extension must not pick the WAV muxer for MP3 data
+            "-c", "copy", "-f", "mp3", output_path,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            for buffer in chunk_audio:
+                buffer.seek(0)
+                while data := buffer.read(1024 * 1024):
+                    process.stdin.write(data)
+                    await process.stdin.drain()
+            process.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            # ffmpeg exited early; its error output says why
+            pass
+        stderr = await process.stderr.read()
+        await process.wait()
+        
+        if process.returncode != 0:
+            logger.warning(
+                "⚠️  ffmpeg concat failed (%s), joining bytes instead",
+                stderr.decode(errors='replace').strip()
+            )
+            self._concatenate_buffers(chunk_audio, output_path)
+    
+    @staticmethod
+    def _concatenate_buffers(chunk_audio: List[IO[bytes]], output_path: str) -> None:
+        """Write the contents of several buffers, in order, to one output file."""
+        with open(output_path, "wb") as output_file:
+            for buffer in chunk_audio:
+                buffer.seek(0)
+                shutil.copyfileobj(buffer, output_file)
+    
+    @staticmethod
+    def _close_buffers(buffers: List[IO[bytes]]) -> None:
+        """Close chunk buffers, deleting any that spilled to disk."""
+        for buffer in buffers:
+            buffer.close()
     
     async def _export_combined_audio(
         self, 
@@ -170,10 +375,9 @@ class TTSService:
                 
                 # For better compatibility, keep it compressed with .wav extension
                 if self.config.audio_bitrate != "uncompressed":
-                    import shutil
                     shutil.copy2(temp_mp3_path, output_path)
-                    print("💡 Note: File saved as compressed audio with .wav extension (actual format: MP3)")
-                    print(f"    Compressed size: {os.path.getsize(output_path):,} bytes")
+                    logger.info("💡 Note: File saved as compressed audio with .wav extension (actual format: MP3)")
+                    logger.info("    Compressed size: %s bytes", f"{os.path.getsize(output_path):,}")
                 else:
                     # Convert to actual WAV if explicitly requested
                     final_audio = AudioSegment.from_mp3(temp_mp3_path)